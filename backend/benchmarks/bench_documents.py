@@ -0,0 +1,100 @@
+"""
+Benchmark serialization of the document list response.
+
+Compares the previous path (json.loads of every form_data, pydantic models,
+then FastAPI's default JSON encoding) with the pass-through path used by
+routes/documents.py. Run from backend/:
+
+    uv run python -m benchmarks.bench_documents --documents 1000
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from fastapi.encoders import jsonable_encoder
+
+from core.serialization import orjson
+from models.documents import DocumentListResponse, DocumentResponse
+from routes.documents import document_to_json
+
+
+def make_documents(count: int, fields: int) -> list[SimpleNamespace]:
+    """Build fake Document rows with realistic, fairly large form_data."""
+    now = datetime.now(timezone.utc)
+    form_data = {
+        "purpose": "Evaluating a potential business relationship " * 10,
+        "party1": {"name": "Jane Doe", "company": "Acme Inc", "noticeAddress": "jane@acme.com"},
+        "party2": {"name": "John Roe", "company": "Globex LLC", "noticeAddress": "john@globex.com"},
+        **{f"field{i}": "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 3 for i in range(fields)},
+    }
+    return [
+        SimpleNamespace(
+            id=i,
+            document_type="mutual_nda",
+            title=f"Document {i}",
+            form_data=json.dumps(form_data),
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+def legacy_list(documents) -> bytes:
+    response = DocumentListResponse(
+        documents=[
+            DocumentResponse(
+                id=doc.id,
+                document_type=doc.document_type,
+                title=doc.title,
+                form_data=json.loads(doc.form_data),
+                created_at=doc.created_at.isoformat(),
+                updated_at=doc.updated_at.isoformat(),
+            )
+            for doc in documents
+        ]
+    )
+    return json.dumps(
+        jsonable_encoder(response), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def passthrough_list(documents) -> bytes:
+    return b'{"documents":[' + b",".join(document_to_json(doc) for doc in documents) + b"]}"
+
+
+def bench(func, documents, repeat: int) -> float:
+    """Best wall time in milliseconds over repeat runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(documents)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--documents", type=int, default=1000)
+    parser.add_argument("--fields", type=int, default=20, help="extra text fields per document")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    documents = make_documents(args.documents, args.fields)
+    assert json.loads(legacy_list(documents)) == json.loads(passthrough_list(documents))
+
+    size_kb = len(passthrough_list(documents)) / 1024
+    legacy_ms = bench(legacy_list, documents, args.repeat)
+    passthrough_ms = bench(passthrough_list, documents, args.repeat)
+    print(f"{args.documents} documents, {size_kb:.0f} KB response")
+    print(f"  legacy (parse + validate + encode): {legacy_ms:8.1f} ms")
+    print(f"  pass-through:                       {passthrough_ms:8.1f} ms")
+    print(f"  speedup:                            {legacy_ms / passthrough_ms:8.1f}x")
+    print(f"  orjson:                             {'installed' if orjson else 'not installed'}")
+
+
+if __name__ == "__main__":
+    main()
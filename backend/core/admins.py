@@ -0,0 +1,36 @@
+"""
+Grant or revoke admin access from the server.
+
+Admin endpoints expose internals such as stack samples, so admin is a flag
+on the user row that can only be set here, never through the API:
+
+    python -m core.admins grant ops@example.com
+"""
+
+import sys
+
+from database import SessionLocal, User, init_db
+
+
+def set_admin(email: str, is_admin: bool) -> bool:
+    """Set the admin flag of the user with this email. Returns False if there is no such user."""
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == email).first()
+        if user is None:
+            return False
+        user.is_admin = is_admin
+        db.commit()
+        return True
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] not in ("grant", "revoke"):
+        sys.exit("usage: python -m core.admins grant|revoke <email>")
+    action, email = sys.argv[1], sys.argv[2]
+    init_db()
+    if not set_admin(email, action == "grant"):
+        sys.exit(f"No user with email {email}")
+    print(f"{'Granted' if action == 'grant' else 'Revoked'} admin for {email}")
@@ -0,0 +1,71 @@
+"""
+Compact storage encoding for Document.form_data.
+
+Stored values are either legacy plain JSON text, or bytes starting with a
+one-byte format version:
+
+    0x01  zlib stream compressed with the FORM_DATA_DICTIONARY_V1 preset dictionary
+
+A dictionary must never change once rows have been written with its version;
+add a new version instead.
+"""
+
+import os
+import zlib
+
+FORMAT_ZLIB_DICT_V1 = 0x01
+
+# zlib level 9 costs little more than 6 on these small payloads
+COMPRESSION_LEVEL = 9
+# Below this size the header overhead outweighs any saving
+MIN_COMPRESS_BYTES = 128
+
+FORM_DATA_COMPRESSION = os.getenv("FORM_DATA_COMPRESSION", "none")
+
+# Preset dictionary built from the keys and boilerplate values common to all
+# document types. zlib favours content near the end, so the most frequent
+# strings (party blocks, shared fields) come last.
+FORM_DATA_DICTIONARY_V1 = "".join([
+    '"aiFeatures":"","trainingDataRights":"","outputOwnership":"",',
+    '"phiDescription":"","permittedUses":"","safeguards":"",',
+    '"dataSubjects":"","processingPurpose":"","dataCategories":"","subprocessors":"",',
+    '"licensedSoftware":"","licenseType":"","licenseFees":"","supportTerms":"",',
+    '"partnershipScope":"","trademarkRights":"","revenueShare":"",',
+    '"deliverables":"","projectTimeline":"","paymentSchedule":"","ipOwnership":"",',
+    '"uptimeTarget":"","responseTimeCommitment":"","serviceCredits":"",',
+    '"programName":"","feedbackRequirements":"","accessPeriod":"",',
+    '"pilotPeriod":"","evaluationPurpose":"","generalCapAmount":"",',
+    '"subscriptionPeriod":"","technicalSupport":"","fees":"","paymentTerms":"",',
+    '"mndaTermType":"expires","mndaTermYears":1,"confidentialityTermType":"years",',
+    '"confidentialityTermYears":1,"modifications":"",',
+    '"providerName":"","customerName":"",',
+    '"purpose":"Evaluating whether to enter into a business relationship with the other party.",',
+    '"effectiveDate":"2025-01-01","governingLaw":"Delaware",',
+    '"jurisdiction":"courts located in New Castle County, Delaware",',
+    '"party2":{"name":"","title":"","company":"","noticeAddress":"","date":""},',
+    '"party1":{"name":"","title":"","company":"","noticeAddress":"","date":""}',
+]).encode("utf-8")
+
+
+def encode_form_data(text: str, compression: str = FORM_DATA_COMPRESSION) -> str | bytes:
+    """Encode JSON text for storage, compressing it when enabled and worthwhile."""
+    raw = text.encode("utf-8")
+    if compression != "zlib" or len(raw) < MIN_COMPRESS_BYTES:
+        return text
+
+    compressor = zlib.compressobj(COMPRESSION_LEVEL, zdict=FORM_DATA_DICTIONARY_V1)
+    packed = bytes([FORMAT_ZLIB_DICT_V1]) + compressor.compress(raw) + compressor.flush()
+    return packed if len(packed) < len(raw) else text
+
+
+def decode_form_data(value: str | bytes) -> str:
+    """Decode a stored form_data value back to JSON text."""
+    if isinstance(value, str):
+        return value
+    if not value:
+        return ""
+    if value[0] == FORMAT_ZLIB_DICT_V1:
+        decompressor = zlib.decompressobj(zdict=FORM_DATA_DICTIONARY_V1)
+        return (decompressor.decompress(value[1:]) + decompressor.flush()).decode("utf-8")
+    # Plain JSON that the driver returned as bytes
+    return value.decode("utf-8")
@@ -1,14 +1,19 @@
 """FastAPI dependencies for authentication."""
 
+import hmac
+import os
 from typing import Optional
 
-from fastapi import Cookie, Depends, HTTPException
+from fastapi import Cookie, Depends, Header, HTTPException
 from sqlalchemy.orm import Session
 
 from database import get_db, User
 from core.security import decode_access_token
 from services.auth_service import AuthService
 
+# Bearer token Prometheus sends to scrape /metrics; unset means admins only
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
 
 async def get_current_user(
     access_token: Optional[str] = Cookie(None),
@@ -56,3 +61,29 @@ async def get_current_user_optional(
         return auth_service.get_user_by_id(int(user_id))
     except HTTPException:
         return None
+
+
+async def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
+    """
+    Dependency for admin-only endpoints.
+    Raises 403 unless the user was granted admin with `python -m core.admins`.
+    """
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return current_user
+
+
+async def require_metrics_access(
+    authorization: Optional[str] = Header(None),
+    current_user: Optional[User] = Depends(get_current_user_optional),
+) -> None:
+    """
+    Dependency for /metrics: the scrape token or an admin user.
+    Raises 401 otherwise, or 403 for signed-in users who aren't admins.
+    """
+    if METRICS_TOKEN and authorization and hmac.compare_digest(authorization, f"Bearer {METRICS_TOKEN}"):
+        return
+    if current_user is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Admin access required")
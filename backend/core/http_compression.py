@@ -0,0 +1,98 @@
+"""gzip/brotli compression of API responses."""
+
+import gzip
+import os
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from core.static_files import accepted_encodings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is an optional speedup
+    brotli = None
+
+# Responses smaller than this gain less than the compression costs
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+# gzip level 1-9; brotli uses the same number as its quality (0-11)
+RESPONSE_COMPRESSION_LEVEL = int(os.getenv("RESPONSE_COMPRESSION_LEVEL", "5"))
+RESPONSE_COMPRESSION_TYPES = frozenset(
+    t.strip()
+    for t in os.getenv("RESPONSE_COMPRESSION_TYPES", "application/json,text/plain,text/csv").split(",")
+    if t.strip()
+)
+
+COMPRESSED_PATH_PREFIX = "/api/"
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=min(RESPONSE_COMPRESSION_LEVEL, 11))
+    return gzip.compress(body, compresslevel=min(RESPONSE_COMPRESSION_LEVEL, 9))
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """Best response coding the client accepts, preferring brotli."""
+    accepted = accepted_encodings(accept_encoding)
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing complete API responses.
+    Streamed responses (more than one body message) pass through untouched so
+    compression never holds back the first bytes.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(COMPRESSED_PATH_PREFIX):
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        start_message = None
+
+        async def send_wrapper(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if start_message is None:
+                await send(message)
+                return
+
+            # Whatever follows the start message, it has to be sent first
+            start, start_message = start_message, None
+            headers = MutableHeaders(raw=list(start.get("headers", [])))
+            media_type = headers.get("content-type", "").split(";")[0].strip()
+            eligible = "content-encoding" not in headers and media_type in RESPONSE_COMPRESSION_TYPES
+            if eligible:
+                # Set even when this response isn't compressed, so caches keep the variants apart
+                headers.add_vary_header("Accept-Encoding")
+
+            body = message.get("body", b"")
+            if (
+                not eligible
+                or encoding is None
+                or message["type"] != "http.response.body"
+                or message.get("more_body", False)
+                or len(body) < RESPONSE_COMPRESSION_MIN_BYTES
+            ):
+                await send({**start, "headers": headers.raw})
+                await send(message)
+                return
+
+            compressed = _compress(body, encoding)
+            headers["content-encoding"] = encoding
+            headers["content-length"] = str(len(compressed))
+            await send({**start, "headers": headers.raw})
+            await send({**message, "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,91 @@
+"""
+Pre-fork multi-worker server.
+
+With WEB_CONCURRENCY > 1 the parent process loads the app and warms shared
+state once, binds the listening socket, then forks that many uvicorn workers.
+Workers inherit everything loaded so far copy-on-write and share the socket.
+Workers that exit unexpectedly are replaced.
+"""
+
+import logging
+import os
+import signal
+import socket
+import time
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+WORKER_ID_ENV = "PRELEGAL_WORKER_ID"
+RESPAWN_DELAY_SECONDS = 1.0
+
+
+def worker_id() -> int:
+    """Index of this worker process, 0 when running a single process."""
+    return int(os.getenv(WORKER_ID_ENV, "0"))
+
+
+def is_primary_worker() -> bool:
+    """Whether this process should run once-per-deployment background work."""
+    return worker_id() == 0
+
+
+def serve(app, host: str, port: int, workers: int = WEB_CONCURRENCY, preload: Optional[Callable[[], None]] = None) -> None:
+    """Run the app with uvicorn, forking workers after preload when workers > 1."""
+    import uvicorn
+
+    if workers <= 1:
+        uvicorn.run(app, host=host, port=port)
+        return
+
+    if preload is not None:
+        preload()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+
+    children: dict[int, int] = {}
+    stopping = False
+
+    def spawn(index: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            os.environ[WORKER_ID_ENV] = str(index)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            server = uvicorn.Server(uvicorn.Config(app))
+            server.run(sockets=[sock])
+            os._exit(0)
+        children[pid] = index
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        # Ctrl-C already reaches the whole process group; SIGTERM (e.g. from Docker) only reaches us
+        if signum == signal.SIGTERM:
+            for pid in children:
+                os.kill(pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    logger.info("Starting %d workers on %s:%d", workers, host, port)
+    for index in range(workers):
+        spawn(index)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        index = children.pop(pid, None)
+        if index is None or stopping:
+            continue
+        logger.warning("Worker %d (pid %d) exited with status %d, restarting", index, pid, status)
+        time.sleep(RESPAWN_DELAY_SECONDS)
+        spawn(index)
+
+    sock.close()
@@ -0,0 +1,214 @@
+"""
+On-demand sampling profiler.
+
+A background thread samples the Python stacks of the event loop thread and
+the thread pools that run request work at a fixed interval, either for a set number of seconds or only while requests matching
+a path prefix or header are in flight. Results can be downloaded as collapsed
+stacks (for flame graph tools) or as a pstats file where counts are samples
+and times are samples multiplied by the interval.
+
+Each worker process has its own profiler.
+"""
+
+import marshal
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+# Thread pools that run app work: asyncio.to_thread, FastAPI's sync routes and
+# dependencies, and password hashing (core.security)
+WORKER_THREAD_PREFIXES = ("asyncio_", "AnyIO worker thread", "bcrypt_")
+# Stacks whose innermost frame is one of these are idle threads, not work
+IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+# Cap on distinct stacks kept, so a long session can't grow without bound
+MAX_DISTINCT_STACKS = 50_000
+MAX_STACK_DEPTH = 128
+
+FrameKey = tuple[str, int, str]
+
+
+class SamplingProfiler:
+    """Samples thread stacks from a background thread while enabled."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.thread: Optional[threading.Thread] = None
+        self.loop_thread_id: Optional[int] = None
+        self.stop_event = threading.Event()
+        self.samples: Counter[tuple[FrameKey, ...]] = Counter()
+        self.interval = 0.01
+        self.started_at: Optional[float] = None
+        self.until: Optional[float] = None
+        self.path_prefix: Optional[str] = None
+        self.header: Optional[tuple[str, Optional[str]]] = None
+        self.active_requests = 0
+        self.matched_requests = 0
+        self.dropped_samples = 0
+
+    @property
+    def running(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    @property
+    def filtered(self) -> bool:
+        return self.path_prefix is not None or self.header is not None
+
+    def start(
+        self,
+        seconds: float,
+        interval: float = 0.01,
+        path_prefix: Optional[str] = None,
+        header_name: Optional[str] = None,
+        header_value: Optional[str] = None,
+    ) -> None:
+        """
+        Start a new profiling session, discarding the previous results.
+        Call from the event loop thread, which is sampled along with the worker pools.
+        """
+        with self.lock:
+            if self.running:
+                raise RuntimeError("Profiler is already running")
+            self.samples = Counter()
+            self.loop_thread_id = threading.get_ident()
+            self.interval = interval
+            self.started_at = time.time()
+            self.until = time.monotonic() + seconds
+            self.path_prefix = path_prefix
+            self.header = (header_name.lower(), header_value) if header_name else None
+            self.active_requests = 0
+            self.matched_requests = 0
+            self.dropped_samples = 0
+            self.stop_event = threading.Event()
+            self.thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self.thread.start()
+
+    def stop(self) -> None:
+        """Stop the current session, keeping its results. Blocks until the sampler exits."""
+        thread = self.thread
+        self.stop_event.set()
+        if thread is not None:
+            thread.join()
+
+    def matches(self, path: str, headers: dict[str, str]) -> bool:
+        """Whether a request should be profiled under the current filters."""
+        if not self.running or not self.filtered:
+            return False
+        if self.path_prefix is not None and not path.startswith(self.path_prefix):
+            return False
+        if self.header is not None:
+            name, value = self.header
+            if name not in headers or (value is not None and headers[name] != value):
+                return False
+        return True
+
+    def status(self) -> dict:
+        samples = self._snapshot()
+        return {
+            "running": self.running,
+            "started_at": self.started_at,
+            "seconds_left": max(0.0, self.until - time.monotonic()) if self.running else 0.0,
+            "interval_ms": self.interval * 1000,
+            "path_prefix": self.path_prefix,
+            "header": self.header[0] if self.header else None,
+            "samples": sum(samples.values()),
+            "distinct_stacks": len(samples),
+            "matched_requests": self.matched_requests,
+            "dropped_samples": self.dropped_samples,
+        }
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self.stop_event.is_set() and time.monotonic() < self.until:
+            if not self.filtered or self.active_requests > 0:
+                self._sample(own_id)
+            self.stop_event.wait(self.interval)
+
+    def _app_thread_ids(self) -> set[int]:
+        """The event loop thread and worker pool threads; other threads aren't serving requests."""
+        return {
+            t.ident for t in threading.enumerate()
+            if t.ident == self.loop_thread_id or t.name.startswith(WORKER_THREAD_PREFIXES)
+        }
+
+    def _sample(self, own_id: int) -> None:
+        app_threads = self._app_thread_ids()
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id or thread_id not in app_threads:
+                continue
+            stack = []
+            while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            if not stack or (os.path.basename(stack[0][0]), stack[0][2]) in IDLE_LEAVES:
+                continue
+            stack.reverse()
+            key = tuple(stack)
+            with self.lock:
+                if key in self.samples or len(self.samples) < MAX_DISTINCT_STACKS:
+                    self.samples[key] += 1
+                else:
+                    self.dropped_samples += 1
+
+    def _snapshot(self) -> Counter[tuple[FrameKey, ...]]:
+        with self.lock:
+            return Counter(self.samples)
+
+    def collapsed(self) -> str:
+        """Samples in the collapsed stack format used by flame graph tools."""
+        lines = []
+        for stack, count in self._snapshot().most_common():
+            frames = ";".join(f"{name} ({os.path.basename(filename)}:{line})" for filename, line, name in stack)
+            lines.append(f"{frames} {count}")
+        return "\n".join(lines) + "\n"
+
+    def pstats(self) -> bytes:
+        """Samples as a marshalled stats dict readable by pstats.Stats."""
+        stats: dict[FrameKey, list] = {}
+        for stack, count in self._snapshot().items():
+            seconds = count * self.interval
+            for func in set(stack):
+                entry = stats.setdefault(func, [0, 0, 0.0, 0.0, {}])
+                entry[0] += count
+                entry[1] += count
+                entry[3] += seconds
+            stats[stack[-1]][2] += seconds
+            for caller, callee in zip(stack, stack[1:]):
+                callers = stats[callee][4]
+                callers[caller] = callers.get(caller, 0) + count
+        return marshal.dumps({func: tuple(entry) for func, entry in stats.items()})
+
+
+profiler = SamplingProfiler()
+
+
+class ProfilerMiddleware:
+    """ASGI middleware that turns sampling on while matching requests run."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not profiler.filtered or not profiler.running:
+            await self.app(scope, receive, send)
+            return
+
+        headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]}
+        if not profiler.matches(scope["path"], headers):
+            await self.app(scope, receive, send)
+            return
+
+        profiler.active_requests += 1
+        profiler.matched_requests += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.active_requests -= 1
@@ -0,0 +1,173 @@
+"""
+Token-bucket rate limiting for API routes.
+
+Bucket state lives in process memory for a single worker. With several workers
+(WEB_CONCURRENCY > 1) it defaults to a small SQLite file (RATE_LIMIT_DB) shared
+between them; RATE_LIMIT_BACKEND=memory|sqlite overrides the choice.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Optional, Protocol
+
+from fastapi import Depends, HTTPException, Request
+
+from database import User
+from core.dependencies import get_current_user_optional
+from core.prefork import WEB_CONCURRENCY
+
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND") or ("sqlite" if WEB_CONCURRENCY > 1 else "memory")
+RATE_LIMIT_DB = os.getenv("RATE_LIMIT_DB", "./rate_limits.db")
+
+# (burst capacity, tokens refilled per minute)
+CHAT_USER_LIMIT = (int(os.getenv("CHAT_USER_BURST", "10")), float(os.getenv("CHAT_USER_PER_MINUTE", "20")))
+CHAT_IP_LIMIT = (int(os.getenv("CHAT_IP_BURST", "20")), float(os.getenv("CHAT_IP_PER_MINUTE", "40")))
+AUTH_IP_LIMIT = (int(os.getenv("AUTH_IP_BURST", "10")), float(os.getenv("AUTH_IP_PER_MINUTE", "10")))
+
+
+class BucketStore(Protocol):
+    """Storage for token buckets."""
+
+    def consume(self, key: str, capacity: int, per_second: float) -> float:
+        """Take one token. Returns 0 if allowed, else seconds until a token is free."""
+        ...
+
+
+def _refill(tokens: float, updated: float, now: float, capacity: int, per_second: float) -> float:
+    return min(capacity, tokens + (now - updated) * per_second)
+
+
+class MemoryBucketStore:
+    """Token buckets held in this process."""
+
+    MAX_BUCKETS = 10_000
+    IDLE_SECONDS = 3600
+
+    def __init__(self):
+        self.buckets: dict[str, tuple[float, float]] = {}
+        self.lock = threading.Lock()
+
+    def consume(self, key: str, capacity: int, per_second: float) -> float:
+        now = time.monotonic()
+        with self.lock:
+            if len(self.buckets) > self.MAX_BUCKETS:
+                self.buckets = {
+                    k: v for k, v in self.buckets.items() if now - v[1] < self.IDLE_SECONDS
+                }
+            tokens, updated = self.buckets.get(key, (capacity, now))
+            tokens = _refill(tokens, updated, now, capacity, per_second)
+            if tokens < 1:
+                self.buckets[key] = (tokens, now)
+                return (1 - tokens) / per_second
+            self.buckets[key] = (tokens - 1, now)
+            return 0.0
+
+
+class SQLiteBucketStore:
+    """
+    Token buckets in a SQLite file, shared by every worker on the host.
+    Each row records when its bucket will be full again; after that it is
+    equivalent to no row at all, so such rows are deleted periodically.
+    """
+
+    PRUNE_INTERVAL_SECONDS = 60
+
+    def __init__(self, path: str):
+        self.path = path
+        self.local = threading.local()
+        self.last_pruned = 0.0
+        # Not kept open: this runs at import, before workers are forked
+        with closing(sqlite3.connect(path, timeout=5.0)) as conn:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(buckets)")}
+            if columns and "full_at" not in columns:
+                # Bucket state is disposable; starting from full buckets is safe
+                conn.execute("DROP TABLE buckets")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets "
+                "(key TEXT PRIMARY KEY, tokens REAL, updated REAL, full_at REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_buckets_full_at ON buckets (full_at)")
+            conn.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self.local.conn = conn
+        return conn
+
+    def consume(self, key: str, capacity: int, per_second: float) -> float:
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+            tokens, updated = row if row else (capacity, now)
+            tokens = _refill(tokens, updated, now, capacity, per_second)
+            wait = 0.0
+            if tokens < 1:
+                wait = (1 - tokens) / per_second
+            else:
+                tokens -= 1
+            conn.execute(
+                "INSERT OR REPLACE INTO buckets (key, tokens, updated, full_at) VALUES (?, ?, ?, ?)",
+                (key, tokens, now, now + (capacity - tokens) / per_second),
+            )
+            if now - self.last_pruned > self.PRUNE_INTERVAL_SECONDS:
+                self.last_pruned = now
+                conn.execute("DELETE FROM buckets WHERE full_at <= ?", (now,))
+            conn.execute("COMMIT")
+            return wait
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+
+def create_bucket_store() -> BucketStore:
+    """Build the bucket store selected by RATE_LIMIT_BACKEND."""
+    if RATE_LIMIT_BACKEND == "sqlite":
+        return SQLiteBucketStore(RATE_LIMIT_DB)
+    return MemoryBucketStore()
+
+
+bucket_store = create_bucket_store()
+
+
+def client_ip(request: Request) -> str:
+    """Best-effort client address for per-IP limits."""
+    return request.client.host if request.client else "unknown"
+
+
+def check_limit(key: str, limit: tuple[int, float]) -> None:
+    """Raise 429 if the bucket for key is empty."""
+    capacity, per_minute = limit
+    wait = bucket_store.consume(key, capacity, per_minute / 60)
+    if wait > 0:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests, please slow down",
+            headers={"Retry-After": str(max(1, round(wait)))},
+        )
+
+
+def limit_auth(request: Request) -> None:
+    """
+    Per-IP limit for sign-in and sign-up.
+    A plain function, like limit_chat, so FastAPI runs it in its thread pool:
+    the SQLite store can block waiting for the database lock.
+    """
+    check_limit(f"auth:ip:{client_ip(request)}", AUTH_IP_LIMIT)
+
+
+def limit_chat(
+    request: Request,
+    current_user: Optional[User] = Depends(get_current_user_optional),
+) -> None:
+    """Per-IP limit for chat, plus a per-user limit when signed in."""
+    check_limit(f"chat:ip:{client_ip(request)}", CHAT_IP_LIMIT)
+    if current_user is not None:
+        check_limit(f"chat:user:{current_user.id}", CHAT_USER_LIMIT)
@@ -0,0 +1,75 @@
+"""Fair-share scheduling of concurrent LLM calls across users."""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+
+from core.metrics import LLM_QUEUE_TIME
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+
+
+class FairScheduler:
+    """
+    Limits concurrent work and hands free slots to waiting clients round-robin,
+    so one client with many queued requests can't starve the others.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self.active = 0
+        self.waiting: OrderedDict[str, deque[asyncio.Future]] = OrderedDict()
+
+    @asynccontextmanager
+    async def slot(self, key: str):
+        """Wait for a slot for the given client key and hold it for the block."""
+        start = time.perf_counter()
+        await self._acquire(key)
+        LLM_QUEUE_TIME.observe(time.perf_counter() - start)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, key: str) -> None:
+        if self.active < self.max_concurrency and not self.waiting:
+            self.active += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self.waiting.setdefault(key, deque()).append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot was handed over just as we were cancelled
+                self._release()
+            else:
+                self._discard(key, future)
+            raise
+
+    def _discard(self, key: str, future: asyncio.Future) -> None:
+        queue = self.waiting.get(key)
+        if queue and future in queue:
+            queue.remove(future)
+            if not queue:
+                del self.waiting[key]
+
+    def _release(self) -> None:
+        self.active -= 1
+        while self.waiting and self.active < self.max_concurrency:
+            # Serve the client at the front, then move it to the back of the line
+            key, queue = next(iter(self.waiting.items()))
+            future = queue.popleft()
+            if queue:
+                self.waiting.move_to_end(key)
+            else:
+                del self.waiting[key]
+            if not future.done():
+                self.active += 1
+                future.set_result(None)
+
+
+llm_scheduler = FairScheduler(LLM_MAX_CONCURRENCY)
@@ -1,27 +1,50 @@
 """Security utilities for authentication."""
 
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
+from core.metrics import BCRYPT_DURATION, BCRYPT_QUEUE_TIME
+
 SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_DAYS = 7
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt is CPU-bound, so cap how many hashes run at once
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", str(os.cpu_count() or 1)))
+bcrypt_executor = ThreadPoolExecutor(max_workers=BCRYPT_WORKERS, thread_name_prefix="bcrypt")
+
+
+def _run_bcrypt(operation: str, func, *args):
+    """Run bcrypt work on the bounded pool, recording queue and run time."""
+    submitted = time.perf_counter()
+
+    def timed():
+        started = time.perf_counter()
+        BCRYPT_QUEUE_TIME.observe(started - submitted, operation=operation)
+        try:
+            return func(*args)
+        finally:
+            BCRYPT_DURATION.observe(time.perf_counter() - started, operation=operation)
+
+    return bcrypt_executor.submit(timed).result()
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return _run_bcrypt("verify", pwd_context.verify, plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """Hash a password for storage."""
-    return pwd_context.hash(password)
+    return _run_bcrypt("hash", pwd_context.hash, password)
 
 
 def create_access_token(user_id: int, email: str) -> str:
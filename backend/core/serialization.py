@@ -0,0 +1,45 @@
+"""Fast JSON encoding, using orjson when it is installed."""
+
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speedup
+    orjson = None
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: str | bytes) -> Any:
+    """Parse JSON from str or bytes."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def splice_json(obj: dict, key: str, raw_json: str) -> bytes:
+    """
+    Serialize obj with an extra key whose value is an already-encoded JSON object.
+    Lets stored JSON be returned without a parse/re-serialize round trip.
+    Raises ValueError if raw_json is not shaped like an object, without parsing it.
+    """
+    if raw_json[:1] != "{" or raw_json[-1:] != "}":
+        raise ValueError(f"{key} is not a JSON object")
+    encoded = dumps(obj)
+    separator = b"," if len(encoded) > 2 else b""
+    return encoded[:-1] + separator + dumps(key) + b":" + raw_json.encode("utf-8") + b"}"
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when available."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
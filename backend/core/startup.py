@@ -0,0 +1,53 @@
+"""Startup import-time reporting, based on python -X importtime."""
+
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Optional
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def measure_imports(module: str = "main") -> list[tuple[str, int, int, int]]:
+    """
+    Import a module in a fresh interpreter with -X importtime.
+    Returns (name, self_us, cumulative_us, depth) for every import.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+
+def print_import_time_report(
+    module: str = "main", top: int = 20, budget_ms: Optional[float] = None
+) -> int:
+    """
+    Print the slowest imports of a module and its total import time.
+    Returns a non-zero exit code if the total exceeds budget_ms.
+    """
+    rows = measure_imports(module)
+    total_ms = next((c for name, _, c, _ in rows if name == module), 0) / 1000
+
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for name, self_us, cumulative_us, depth in sorted(rows, key=lambda r: r[2], reverse=True)[:top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {'  ' * depth}{name}")
+    print(f"\nTotal import time for {module}: {total_ms:.1f} ms")
+
+    if budget_ms is not None and total_ms > budget_ms:
+        print(f"Over startup budget of {budget_ms:.1f} ms")
+        return 1
+    return 0
@@ -0,0 +1,180 @@
+"""
+Serving of the exported frontend build.
+
+The build directory is indexed once at startup: each file's media type, ETag
+and any precompressed .br/.gz siblings are recorded so requests never touch
+the filesystem to decide what to send. index.html is kept in memory.
+
+Precompressed siblings are written at build time with:
+
+    python -m core.static_files ../frontend/out
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import sys
+from pathlib import Path
+from typing import Mapping, Optional
+
+from fastapi.responses import FileResponse, Response
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is an optional speedup
+    brotli = None
+
+# Next.js puts content-hashed bundles here, so they never change in place
+IMMUTABLE_PREFIX = "_next/static/"
+# Build output; a miss here is a stale or bad asset URL, not a client-side route
+BUILD_PREFIX = "_next/"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Everything else may change on deploy and is revalidated with its ETag
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+COMPRESSIBLE_SUFFIXES = {".html", ".js", ".css", ".json", ".txt", ".svg", ".xml", ".map", ".ico", ".webmanifest"}
+PRECOMPRESS_MIN_BYTES = 1024
+
+# Preferred first when the client accepts several
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _available_encodings() -> list[tuple[str, str]]:
+    return [(encoding, suffix) for encoding, suffix in ENCODINGS if encoding != "br" or brotli is not None]
+
+
+def accepted_encodings(accept_encoding: str) -> set[str]:
+    """Content codings a client accepts, ignoring any with q=0."""
+    accepted = set()
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        params = params.replace(" ", "")
+        if coding and params not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(coding.lower())
+    return accepted
+
+
+class StaticAsset:
+    """One servable file and its precompressed variants."""
+
+    __slots__ = ("path", "media_type", "etag", "cache_control", "stat", "variants", "body")
+
+    def __init__(self, path: Path, relative: str, in_memory: bool = False):
+        data = path.read_bytes()
+        digest = hashlib.blake2b(data, digest_size=12).hexdigest()
+
+        self.path = path
+        self.media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        self.etag = f'"{digest}"'
+        self.cache_control = (
+            IMMUTABLE_CACHE_CONTROL if relative.startswith(IMMUTABLE_PREFIX) else REVALIDATE_CACHE_CONTROL
+        )
+        self.stat = path.stat()
+        # encoding -> (path, stat) for files on disk, or bytes when held in memory
+        self.variants: dict[str, tuple[Path, os.stat_result] | bytes] = {}
+        self.body: Optional[bytes] = data if in_memory else None
+
+        for encoding, suffix in _available_encodings():
+            sibling = path.with_name(path.name + suffix)
+            if sibling.is_file():
+                self.variants[encoding] = (sibling, sibling.stat())
+            elif in_memory and path.suffix in COMPRESSIBLE_SUFFIXES:
+                self.variants[encoding] = _compress(data, encoding)
+
+    def etags(self) -> set[str]:
+        """Strong ETags of every representation of this asset."""
+        return {self.etag} | {self._variant_etag(encoding) for encoding in self.variants}
+
+    def _variant_etag(self, encoding: Optional[str]) -> str:
+        return self.etag if encoding is None else f'{self.etag[:-1]}-{encoding}"'
+
+    def response(self, headers: Mapping[str, str]) -> Response:
+        """Build a response for a request with the given headers."""
+        accepted = accepted_encodings(headers.get("accept-encoding", ""))
+        encoding = next((e for e, _ in ENCODINGS if e in self.variants and e in accepted), None)
+
+        response_headers = {
+            "Cache-Control": self.cache_control,
+            "ETag": self._variant_etag(encoding),
+            "Vary": "Accept-Encoding",
+        }
+
+        if_none_match = headers.get("if-none-match")
+        if if_none_match:
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            if "*" in tags or tags & self.etags():
+                return Response(status_code=304, headers=response_headers)
+
+        if encoding is not None:
+            response_headers["Content-Encoding"] = encoding
+            variant = self.variants[encoding]
+            if isinstance(variant, bytes):
+                return Response(variant, media_type=self.media_type, headers=response_headers)
+            path, stat = variant
+            return FileResponse(path, media_type=self.media_type, headers=response_headers, stat_result=stat)
+
+        if self.body is not None:
+            return Response(self.body, media_type=self.media_type, headers=response_headers)
+        return FileResponse(self.path, media_type=self.media_type, headers=response_headers, stat_result=self.stat)
+
+
+class StaticSite:
+    """Index of a static build directory with SPA fallback to index.html."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.assets: dict[str, StaticAsset] = {}
+        compressed_suffixes = tuple(suffix for _, suffix in ENCODINGS)
+
+        for path in sorted(root.rglob("*")):
+            if not path.is_file() or path.name.endswith(compressed_suffixes):
+                continue
+            relative = path.relative_to(root).as_posix()
+            self.assets[relative] = StaticAsset(path, relative, in_memory=relative == "index.html")
+
+        self.index = self.assets.get("index.html")
+
+    def response(self, full_path: str, headers: Mapping[str, str]) -> Optional[Response]:
+        """Response for a request path, or None if there is nothing to serve."""
+        asset = self.assets.get(full_path) if full_path else None
+        if asset is None:
+            if full_path.startswith(BUILD_PREFIX):
+                return Response(status_code=404)
+            asset = self.index
+        return asset.response(headers) if asset is not None else None
+
+
+def precompress(root: Path) -> int:
+    """Write .br/.gz siblings next to compressible files. Returns the number written."""
+    written = 0
+    compressed_suffixes = tuple(suffix for _, suffix in ENCODINGS)
+    for path in sorted(root.rglob("*")):
+        if (
+            not path.is_file()
+            or path.name.endswith(compressed_suffixes)
+            or path.suffix not in COMPRESSIBLE_SUFFIXES
+            or path.stat().st_size < PRECOMPRESS_MIN_BYTES
+        ):
+            continue
+        data = path.read_bytes()
+        for encoding, suffix in _available_encodings():
+            compressed = _compress(data, encoding)
+            if len(compressed) < len(data):
+                path.with_name(path.name + suffix).write_bytes(compressed)
+                written += 1
+    return written
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("usage: python -m core.static_files <build directory>")
+    if brotli is None:
+        print("brotli not installed, writing gzip variants only", file=sys.stderr)
+    print(f"Wrote {precompress(Path(sys.argv[1]))} precompressed files")
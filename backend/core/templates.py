@@ -0,0 +1,112 @@
+"""Access to the legal document templates and catalog.json."""
+
+import json
+import logging
+import re
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent.parent
+TEMPLATES_DIR = ROOT_DIR / "templates"
+CATALOG_PATH = ROOT_DIR / "catalog.json"
+
+logger = logging.getLogger(__name__)
+
+HEADING_SPAN_RE = re.compile(r'<span class="header_\d"[^>]*>(.*?)</span>')
+TAG_RE = re.compile(r"<[^>]+>")
+SECTION_ID_RE = re.compile(r'<span[^>]*\bid="([\d.]+)"')
+LIST_ITEM_RE = re.compile(r"^(\s*)(\d+|[a-z]|[ivx]+)\.\s+(.*)$")
+BOLD_LEAD_RE = re.compile(r"^\*\*(.+?)\*\*")
+
+
+def load_catalog() -> list[dict]:
+    """Load template entries from catalog.json. Returns [] if it is missing."""
+    if not CATALOG_PATH.exists():
+        logger.warning("Template catalog not found at %s; classifier and clause search will be empty", CATALOG_PATH)
+        return []
+    with open(CATALOG_PATH, encoding="utf-8") as f:
+        return json.load(f).get("templates", [])
+
+
+def read_template(filename: str) -> str:
+    """Read a template's markdown. Returns "" if the file is missing."""
+    path = TEMPLATES_DIR / filename
+    if not path.is_file():
+        logger.warning("Template %s not found in %s", filename, TEMPLATES_DIR)
+        return ""
+    return path.read_text(encoding="utf-8")
+
+
+def strip_markup(text: str) -> str:
+    """Remove HTML tags and markdown emphasis from template text."""
+    return TAG_RE.sub("", text).replace("**", "").strip()
+
+
+def extract_headings(markdown: str) -> list[str]:
+    """Extract markdown and numbered section headings from a template."""
+    headings = []
+    for line in markdown.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("#"):
+            headings.append(strip_markup(stripped.lstrip("#")))
+        for match in HEADING_SPAN_RE.finditer(line):
+            headings.append(strip_markup(match.group(1)).rstrip("."))
+    return [h for h in headings if h]
+
+
+def _section_heading(text: str) -> str:
+    """Heading of a numbered clause: its header span, or a leading bold term."""
+    match = HEADING_SPAN_RE.search(text)
+    if match is None:
+        match = BOLD_LEAD_RE.match(TAG_RE.sub("", text).strip())
+    if match is None:
+        return ""
+    return strip_markup(match.group(1)).strip('"\u201c\u201d').rstrip(".")
+
+
+def split_sections(markdown: str) -> list[dict]:
+    """
+    Split a template into sections at numbered clauses and markdown headings.
+    Each section has its number (e.g. "4.2", "" for markdown headings), heading,
+    the headings of its parent sections and its plain text.
+    """
+    sections = []
+    # (indent, number part, heading) of the enclosing numbered clauses
+    stack: list[tuple[int, str, str]] = []
+    current = None
+
+    for line in markdown.splitlines():
+        if not line.strip():
+            continue
+
+        if line.startswith("#"):
+            level = len(line) - len(line.lstrip("#"))
+            stack = []
+            current = None
+            if level > 1:
+                current = {"number": "", "heading": strip_markup(line.lstrip("#")), "path": [], "text": ""}
+                sections.append(current)
+            continue
+
+        item = LIST_ITEM_RE.match(line)
+        if item is None:
+            if current is not None:
+                current["text"] = (current["text"] + " " + strip_markup(line)).strip()
+            continue
+
+        indent, marker, rest = len(item.group(1)), item.group(2), item.group(3)
+        while stack and stack[-1][0] >= indent:
+            stack.pop()
+        section_id = SECTION_ID_RE.search(rest)
+        number = section_id.group(1) if section_id else ".".join([part for _, part, _ in stack] + [marker])
+        heading = _section_heading(rest)
+
+        current = {
+            "number": number,
+            "heading": heading,
+            "path": [h for _, _, h in stack if h],
+            "text": strip_markup(rest),
+        }
+        sections.append(current)
+        stack.append((indent, number.rsplit(".", 1)[-1] if section_id else marker, heading))
+
+    return sections
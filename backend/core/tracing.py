@@ -0,0 +1,241 @@
+"""
+Lightweight request tracing with OpenTelemetry-compatible span output.
+
+Spans are exported as OTLP/JSON, either appended to a file (TRACE_EXPORT_FILE,
+one resourceSpans batch per line) or posted to a collector (TRACE_EXPORT_URL,
+e.g. http://localhost:4318/v1/traces). Tracing is off when neither is set.
+"""
+
+import functools
+import inspect
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+import httpx
+
+TRACE_EXPORT_FILE = os.getenv("TRACE_EXPORT_FILE")
+TRACE_EXPORT_URL = os.getenv("TRACE_EXPORT_URL")
+SERVICE_NAME = "prelegal-backend"
+
+EXPORT_BATCH_SIZE = 100
+EXPORT_INTERVAL_SECONDS = 2.0
+
+REQUEST_ID_HEADER = "x-request-id"
+
+
+class Span:
+    """A single timed operation within a trace."""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: dict):
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+def _otlp_attribute(key: str, value) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class SpanExporter:
+    """Batches finished spans and exports them from a background thread."""
+
+    def __init__(self, file_path: Optional[str], url: Optional[str]):
+        self.file_path = file_path
+        self.url = url
+        self._start()
+
+    def _start(self) -> None:
+        # Threads don't survive fork, so each worker process starts its own
+        self.pid = os.getpid()
+        self.queue: queue.Queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self.thread.start()
+
+    def export(self, span: Span) -> None:
+        if self.pid != os.getpid():
+            self._start()
+        self.queue.put(span)
+
+    def _run(self) -> None:
+        while True:
+            batch = []
+            deadline = time.monotonic() + EXPORT_INTERVAL_SECONDS
+            while len(batch) < EXPORT_BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch: list[Span]) -> None:
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", SERVICE_NAME)]},
+                "scopeSpans": [{"scope": {"name": "prelegal"}, "spans": [s.to_otlp() for s in batch]}],
+            }]
+        }
+        try:
+            if self.file_path:
+                with open(self.file_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(payload) + "\n")
+            if self.url:
+                httpx.post(self.url, json=payload, timeout=5.0)
+        except (OSError, httpx.HTTPError):
+            pass  # Tracing must never break the app
+
+
+_exporter = SpanExporter(TRACE_EXPORT_FILE, TRACE_EXPORT_URL) if TRACE_EXPORT_FILE or TRACE_EXPORT_URL else None
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+
+def get_request_id() -> Optional[str]:
+    """Return the id of the request being handled, if any."""
+    return _request_id.get()
+
+
+@contextmanager
+def span(name: str, trace_id: Optional[str] = None, parent_id: Optional[str] = None, **attributes):
+    """
+    Time a block of code as a span, nested under the current span.
+    Yields None when tracing is disabled.
+    """
+    if _exporter is None:
+        yield None
+        return
+
+    parent = _current_span.get()
+    if trace_id is None:
+        trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        parent_id = parent.span_id if parent else None
+    current = Span(name, trace_id, parent_id, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end_ns = time.time_ns()
+        _exporter.export(current)
+
+
+def traced(name: Optional[str] = None):
+    """Decorator that wraps a sync or async function in a span."""
+
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def _parse_traceparent(header: Optional[str]) -> tuple[Optional[str], Optional[str]]:
+    """Parse a W3C traceparent header into (trace_id, parent_span_id)."""
+    if not header:
+        return None, None
+    parts = header.split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None, None
+    return parts[1], parts[2]
+
+
+class RequestIdMiddleware:
+    """
+    ASGI middleware assigning each request an id and a root span.
+    Honours incoming X-Request-ID and traceparent headers and echoes both back.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]}
+        request_id = headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+        trace_id, parent_id = _parse_traceparent(headers.get("traceparent"))
+        request_token = _request_id.set(request_id)
+
+        with span(
+            f"{scope['method']} {scope['path']}",
+            trace_id=trace_id or secrets.token_hex(16),
+            parent_id=parent_id,
+            **{"http.method": scope["method"], "http.target": scope["path"], "request.id": request_id},
+        ) as root:
+
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    extra = [(b"x-request-id", request_id.encode("latin-1"))]
+                    if root is not None:
+                        root.set_attribute("http.status_code", message["status"])
+                        traceparent = f"00-{root.trace_id}-{root.span_id}-01"
+                        extra.append((b"traceparent", traceparent.encode("latin-1")))
+                    message["headers"] = list(message.get("headers", [])) + extra
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = scope.get("route")
+                if root is not None and route is not None:
+                    root.name = f"{scope['method']} {route.path}"
+                _request_id.reset(request_token)
@@ -1,9 +1,17 @@
 """Database configuration and models."""
 
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text, ForeignKey
+import time
+
+from sqlalchemy import create_engine, event, Boolean, Column, Integer, String, DateTime, Text, Float, ForeignKey, Index
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import sessionmaker, declarative_base, relationship
+from sqlalchemy.types import TypeDecorator
 from datetime import datetime, timezone
 
+from core.compression import decode_form_data, encode_form_data
+from core.metrics import DB_QUERY_DURATION
+from core.serialization import loads
+
 DATABASE_URL = "sqlite:///./prelegal.db"
 
 engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
@@ -11,6 +19,48 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+@event.listens_for(engine, "connect")
+def _configure_sqlite(dbapi_connection, connection_record):
+    # WAL lets worker processes read while another writes
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _record_query_time(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    DB_QUERY_DURATION.observe(elapsed, statement=statement.split(None, 1)[0].upper())
+
+
+class CompressedJSONText(TypeDecorator):
+    """
+    JSON text that may be stored compressed (see core.compression).
+    Compressed values are SQLite BLOBs in the TEXT column; reads always return str.
+    Values are validated on write because reads pass the text through unparsed.
+    """
+
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        loads(value)
+        return encode_form_data(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return decode_form_data(value)
+
+
 class User(Base):
     """User model for authentication."""
 
@@ -19,6 +69,8 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
+    # Only set with `python -m core.admins`, never through the API
+    is_admin = Column(Boolean, nullable=False, default=False, server_default="0")
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
     documents = relationship("Document", back_populates="user", cascade="all, delete-orphan")
@@ -33,7 +85,7 @@ class Document(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     document_type = Column(String, nullable=False)
     title = Column(String, nullable=False)
-    form_data = Column(Text, nullable=False)  # JSON serialized
+    form_data = Column(CompressedJSONText, nullable=False)  # JSON serialized
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(
         DateTime,
@@ -44,9 +96,81 @@ class Document(Base):
     user = relationship("User", back_populates="documents")
 
 
+class LLMUsage(Base):
+    """Token usage and latency of a single LLM call."""
+
+    __tablename__ = "llm_usage"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
+    document_type = Column(String, nullable=True, index=True)
+    model = Column(String, nullable=False)
+    prompt_tokens = Column(Integer, nullable=False, default=0)
+    completion_tokens = Column(Integer, nullable=False, default=0)
+    cached_tokens = Column(Integer, nullable=False, default=0)
+    cost_usd = Column(Float, nullable=True)
+    latency_ms = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)
+
+
+class Job(Base):
+    """Background job run by the embedded job queue (see services.job_queue)."""
+
+    __tablename__ = "jobs"
+
+    id = Column(String(32), primary_key=True)
+    job_type = Column(String, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
+    # SHA-256 of the secret that grants access to an anonymous job
+    token_hash = Column(String(64), nullable=True)
+    status = Column(String, nullable=False, default="queued")  # queued, running, succeeded, failed
+    payload = Column(Text, nullable=False)  # JSON serialized
+    result = Column(Text, nullable=True)  # JSON serialized
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+    locked_until = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(
+        DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+
+    __table_args__ = (Index("ix_jobs_claim", "job_type", "status", "run_after"),)
+
+
+# Columns added after their table was first created; create_all doesn't alter existing tables
+ADDED_COLUMNS = {
+    "users": {"is_admin": "BOOLEAN NOT NULL DEFAULT 0"},
+    "jobs": {"token_hash": "VARCHAR(64)"},
+}
+
+
 def init_db():
-    """Create all database tables."""
-    Base.metadata.create_all(bind=engine)
+    """Create all database tables. Safe to call from several workers at once."""
+    try:
+        Base.metadata.create_all(bind=engine)
+    except OperationalError:
+        # Another worker created a table between our existence check and CREATE
+        Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
+
+
+def _add_missing_columns():
+    for table, columns in ADDED_COLUMNS.items():
+        with engine.connect() as conn:
+            existing = {row[1] for row in conn.exec_driver_sql(f"PRAGMA table_info({table})")}
+        for name, ddl in columns.items():
+            if name in existing:
+                continue
+            try:
+                with engine.begin() as conn:
+                    conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}")
+            except OperationalError:
+                # Another worker added it first
+                pass
 
 
 def get_db():
@@ -1,30 +1,88 @@
 """FastAPI application for Prelegal."""
 
+import asyncio
 import os
+import sys
+import threading
 from pathlib import Path
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
-from database import init_db
+from core.dependencies import require_metrics_access
+from core.serialization import FastJSONResponse
+from core.http_compression import CompressionMiddleware
+from core.metrics import MetricsMiddleware, render_metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from core.prefork import is_primary_worker, serve
+from core.profiler import ProfilerMiddleware
+from core.static_files import StaticSite
+from core.tracing import RequestIdMiddleware
+from database import engine, init_db
 from routes.auth import router as auth_router
 from routes.chat import router as chat_router
+from routes.clauses import router as clauses_router
 from routes.documents import router as documents_router
+from routes.jobs import router as jobs_router
+from routes.profiler import router as profiler_router
+from routes.usage import router as usage_router
+from services.ai_service import open_http_client, close_http_client, get_system_prompt, warm_up
+from services.clause_index import get_clause_index
+from services.document_classifier import get_classifier
+from services.job_queue import job_queue
+from services.storage_migration import migrate_form_data
+from services.usage_service import usage_recorder
 
 load_dotenv()
 
 STATIC_DIR = Path(__file__).parent.parent / "frontend" / "out"
+LLM_WARMUP = os.getenv("LLM_WARMUP", "true").lower() == "true"
+
+
+def warm_caches() -> None:
+    """Build the classifier, clause index (from the templates) and the system prompt."""
+    get_classifier()
+    get_clause_index()
+    get_system_prompt()
+
+
+def preload() -> None:
+    """Prepare shared state once in the parent before workers are forked."""
+    init_db()
+    # Workers must open their own database connections
+    engine.dispose()
+    warm_caches()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialize database on startup."""
+    """
+    Initialize database, caches and LLM connection pool on startup.
+    LiteLLM is loaded and stored documents re-encoded in the background
+    so neither delays readiness.
+    """
     init_db()
+    warm_caches()
+    open_http_client()
+    usage_recorder.start()
+    job_queue.start(prune=is_primary_worker())
+    warm_up_task = asyncio.create_task(asyncio.to_thread(warm_up)) if LLM_WARMUP else None
+    migration_task = None
+    migration_stop = threading.Event()
+    if is_primary_worker():
+        migration_task = asyncio.create_task(asyncio.to_thread(migrate_form_data, migration_stop))
     yield
+    if migration_task is not None:
+        migration_stop.set()
+        await asyncio.gather(migration_task, return_exceptions=True)
+    if warm_up_task is not None:
+        # A failed warm-up is retried by the first chat request
+        await asyncio.gather(warm_up_task, return_exceptions=True)
+    await job_queue.stop()
+    await usage_recorder.stop()
+    await close_http_client()
 
 
 app = FastAPI(
@@ -32,6 +90,7 @@ app = FastAPI(
     description="Backend API for Prelegal legal document SaaS",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 app.add_middleware(
@@ -45,9 +104,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(ProfilerMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(RequestIdMiddleware)
+
 app.include_router(auth_router)
 app.include_router(chat_router)
+app.include_router(clauses_router)
 app.include_router(documents_router)
+app.include_router(jobs_router)
+app.include_router(profiler_router)
+app.include_router(usage_router)
 
 
 @app.get("/api/health")
@@ -56,19 +124,37 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics_access)])
+async def metrics():
+    """Expose metrics in the Prometheus text format."""
+    return Response(content=render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+
 if STATIC_DIR.exists():
-    app.mount("/_next", StaticFiles(directory=STATIC_DIR / "_next"), name="next_static")
+    static_site = StaticSite(STATIC_DIR)
 
     @app.get("/{full_path:path}")
-    async def serve_spa(full_path: str):
+    async def serve_spa(full_path: str, request: Request):
         """Serve static files or fallback to index.html for SPA routing."""
-        file_path = STATIC_DIR / full_path
+        response = static_site.response(full_path, request.headers)
+        if response is not None:
+            return response
+
+        return {"error": "Frontend not built. Run 'npm run build' in frontend/"}
 
-        if full_path and file_path.exists() and file_path.is_file():
-            return FileResponse(file_path)
 
-        index_path = STATIC_DIR / "index.html"
-        if index_path.exists():
-            return FileResponse(index_path)
+if __name__ == "__main__":
+    import argparse
 
-        return {"error": "Frontend not built. Run 'npm run build' in frontend/"}
+    parser = argparse.ArgumentParser(description="Run the Prelegal API")
+    parser.add_argument("--import-time", action="store_true", help="print an import-time breakdown and exit")
+    parser.add_argument("--top", type=int, default=20, help="number of slowest imports to show")
+    parser.add_argument("--budget-ms", type=float, help="exit non-zero if total import time exceeds this")
+    args = parser.parse_args()
+
+    if args.import_time:
+        from core.startup import print_import_time_report
+
+        sys.exit(print_import_time_report("main", top=args.top, budget_ms=args.budget_ms))
+
+    serve(app, host="0.0.0.0", port=8000, preload=preload)
@@ -0,0 +1,24 @@
+"""Pydantic models for template clause search."""
+
+from typing import Optional
+from pydantic import BaseModel
+
+
+class ClauseResult(BaseModel):
+    """A template section matching a search."""
+
+    template: str
+    template_name: str
+    document_type: Optional[str]
+    number: str
+    heading: str
+    path: list[str]
+    snippet: str
+    score: float
+
+
+class ClauseSearchResponse(BaseModel):
+    """Ranked clause search results."""
+
+    query: str
+    results: list[ClauseResult]
@@ -29,51 +29,62 @@ class PartyInfo(BaseModel):
     date: Optional[str] = None
 
 
-# Document catalog with descriptions for AI
+# Document catalog with descriptions for AI and source template filenames
 DOCUMENT_CATALOG = {
     DocumentType.MUTUAL_NDA: {
         "name": "Mutual Non-Disclosure Agreement",
         "description": "A standard mutual NDA for protecting confidential information exchanged between two parties evaluating a potential business relationship.",
+        "templates": ["Mutual-NDA.md", "Mutual-NDA-coverpage.md"],
     },
     DocumentType.CLOUD_SERVICE: {
         "name": "Cloud Service Agreement",
         "description": "A comprehensive agreement for selling and buying cloud software and SaaS products, covering access, payment, security, liability, and confidentiality.",
+        "templates": ["Cloud-Service-Agreement.md"],
     },
     DocumentType.PILOT: {
         "name": "Pilot Agreement",
         "description": "A short-term trial or evaluation agreement allowing prospective customers to test a product before committing to a longer-term deal.",
+        "templates": ["Pilot-Agreement.md"],
     },
     DocumentType.DESIGN_PARTNER: {
         "name": "Design Partner Agreement",
         "description": "An agreement for early product access where partners provide feedback in exchange for using pre-release software.",
+        "templates": ["Design-Partner-Agreement.md"],
     },
     DocumentType.SLA: {
         "name": "Service Level Agreement",
         "description": "A standard SLA defining uptime targets, response time commitments, service credits, and remedies for cloud service providers.",
+        "templates": ["Service-Level-Agreement.md"],
     },
     DocumentType.PROFESSIONAL_SERVICES: {
         "name": "Professional Services Agreement",
         "description": "An agreement for professional services engagements covering deliverables, intellectual property, payment terms, and project management.",
+        "templates": ["Professional-Services-Agreement.md"],
     },
     DocumentType.PARTNERSHIP: {
         "name": "Partnership Agreement",
         "description": "A standard agreement for business partnerships covering cooperation obligations, trademark licensing, fees, confidentiality, and liability.",
+        "templates": ["Partnership-Agreement.md"],
     },
     DocumentType.SOFTWARE_LICENSE: {
         "name": "Software License Agreement",
         "description": "A comprehensive license agreement for on-premise or installable software, covering licensing terms, restrictions, warranties, and support.",
+        "templates": ["Software-License-Agreement.md"],
     },
     DocumentType.DPA: {
         "name": "Data Processing Agreement",
         "description": "A GDPR-compliant data processing agreement covering data protection obligations, subprocessors, international transfers, and security requirements.",
+        "templates": ["Data-Processing-Agreement.md"],
     },
     DocumentType.BAA: {
         "name": "Business Associate Agreement",
         "description": "A HIPAA-compliant agreement for business associates handling protected health information (PHI).",
+        "templates": ["Business-Associate-Agreement.md"],
     },
     DocumentType.AI_ADDENDUM: {
         "name": "AI Addendum",
         "description": "An addendum for agreements involving AI/ML features, covering input/output ownership, model training restrictions, and AI-specific disclaimers.",
+        "templates": ["AI-Addendum.md"],
     },
 }
 
@@ -0,0 +1,26 @@
+"""Pydantic models for background jobs."""
+
+from typing import Optional
+from pydantic import BaseModel
+
+
+class JobCreatedResponse(BaseModel):
+    """Returned when work has been queued."""
+
+    job_id: str
+    status: str
+    # Only for anonymous jobs: pass as ?token= to read the job
+    token: Optional[str] = None
+
+
+class JobResponse(BaseModel):
+    """Current state of a background job."""
+
+    id: str
+    job_type: str
+    status: str
+    attempts: int
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: str
+    updated_at: str
@@ -0,0 +1,32 @@
+"""Pydantic models for the admin profiler."""
+
+from typing import Optional
+from pydantic import BaseModel, Field
+
+
+class ProfilerStartRequest(BaseModel):
+    """
+    Start a sampling session. Without a path prefix or header every request is
+    sampled for the whole session; with either, only matching requests are.
+    """
+
+    seconds: float = Field(30, gt=0, le=600)
+    interval_ms: float = Field(10, ge=1, le=1000)
+    path_prefix: Optional[str] = None
+    header_name: Optional[str] = None
+    header_value: Optional[str] = None
+
+
+class ProfilerStatusResponse(BaseModel):
+    """State of the profiler in the worker that handled the request."""
+
+    running: bool
+    started_at: Optional[float]
+    seconds_left: float
+    interval_ms: float
+    path_prefix: Optional[str]
+    header: Optional[str]
+    samples: int
+    distinct_stacks: int
+    matched_requests: int
+    dropped_samples: int
@@ -0,0 +1,24 @@
+"""Pydantic models for LLM usage reporting."""
+
+from typing import Optional
+from pydantic import BaseModel
+
+
+class UsageSummaryRow(BaseModel):
+    """Aggregated usage for one document type."""
+
+    document_type: Optional[str]
+    calls: int
+    prompt_tokens: int
+    completion_tokens: int
+    cached_tokens: int
+    cost_usd: float
+    avg_latency_ms: float
+
+
+class UsageSummaryResponse(BaseModel):
+    """Usage totals for a time window, broken down by document type."""
+
+    days: int
+    total_tokens: int
+    by_document_type: list[UsageSummaryRow]
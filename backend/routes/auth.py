@@ -1,23 +1,26 @@
 """Authentication routes."""
 
 from fastapi import APIRouter, Depends, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from database import get_db, User
 from models.auth import SignupRequest, SigninRequest, UserResponse, AuthResponse
 from services.auth_service import AuthService
 from core.dependencies import get_current_user
+from core.rate_limit import limit_auth
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 COOKIE_MAX_AGE = 60 * 60 * 24 * 7  # 7 days
 
 
-@router.post("/signup", response_model=AuthResponse)
+@router.post("/signup", response_model=AuthResponse, dependencies=[Depends(limit_auth)])
 async def signup(request: SignupRequest, response: Response, db: Session = Depends(get_db)):
     """Register a new user account."""
     auth_service = AuthService(db)
-    user, token = auth_service.signup(request.email, request.password)
+    # Password hashing is slow, keep it off the event loop
+    user, token = await run_in_threadpool(auth_service.signup, request.email, request.password)
 
     response.set_cookie(
         key="access_token",
@@ -34,11 +37,11 @@ async def signup(request: SignupRequest, response: Response, db: Session = Depen
     )
 
 
-@router.post("/signin", response_model=AuthResponse)
+@router.post("/signin", response_model=AuthResponse, dependencies=[Depends(limit_auth)])
 async def signin(request: SigninRequest, response: Response, db: Session = Depends(get_db)):
     """Sign in to an existing account."""
     auth_service = AuthService(db)
-    user, token = auth_service.signin(request.email, request.password)
+    user, token = await run_in_threadpool(auth_service.signin, request.email, request.password)
 
     response.set_cookie(
         key="access_token",
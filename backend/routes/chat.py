@@ -1,30 +1,98 @@
 """Chat API routes for AI-powered NDA creation."""
 
-from fastapi import APIRouter, HTTPException
-from models.chat import ChatRequest, ChatResponse
-from services.ai_service import get_greeting, process_message
+import os
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.orm import Session
+
+from database import get_db, User
+from models.chat import ChatRequest, ChatResponse, Message
+from models.jobs import JobCreatedResponse
+from services.ai_service import LLM_TIMEOUT, get_greeting, process_message
+from services.job_queue import hash_job_token, job_queue
+from services.usage_service import UsageService
+from core.dependencies import get_current_user_optional
+from core.rate_limit import client_ip, limit_chat
+
+# Queued chat messages processed at once by each worker process
+CHAT_JOB_CONCURRENCY = int(os.getenv("CHAT_JOB_CONCURRENCY", "4"))
 
 router = APIRouter(prefix="/api/chat", tags=["chat"])
 
 
+@job_queue.handler("chat", concurrency=CHAT_JOB_CONCURRENCY, max_attempts=2, visibility_timeout=LLM_TIMEOUT + 30)
+async def run_chat_job(payload: dict) -> dict:
+    """Process a queued chat message; the job result is the ChatResponse."""
+    messages = [Message(**message) for message in payload["messages"]]
+    result = await process_message(messages, payload.get("user_id"), payload.get("client_key", "anonymous"))
+    return result.model_dump(exclude_none=True)
+
+
 @router.get("/greeting", response_model=ChatResponse)
 async def greeting():
     """Get the initial AI greeting message."""
     return get_greeting()
 
 
-@router.post("/message", response_model=ChatResponse)
-async def send_message(request: ChatRequest):
+def check_chat_request(
+    request: ChatRequest, http_request: Request, current_user: Optional[User], db: Session
+) -> tuple[Optional[int], str]:
+    """Validate a chat request and enforce the quota. Returns (user_id, client_key)."""
+    if not request.messages:
+        raise HTTPException(status_code=400, detail="Messages cannot be empty")
+
+    user_id = current_user.id if current_user else None
+    client_key = f"user:{user_id}" if user_id is not None else f"ip:{client_ip(http_request)}"
+    if user_id is not None and UsageService(db).is_over_quota(user_id):
+        raise HTTPException(status_code=429, detail="Monthly AI usage quota exceeded")
+    return user_id, client_key
+
+
+@router.post("/message", response_model=ChatResponse, dependencies=[Depends(limit_chat)])
+async def send_message(
+    request: ChatRequest,
+    http_request: Request,
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    db: Session = Depends(get_db),
+):
     """
     Send a message and get AI response with extracted NDA fields.
 
     The request should include the full conversation history.
     The response includes the AI's reply and any extracted NDA fields.
     """
-    if not request.messages:
-        raise HTTPException(status_code=400, detail="Messages cannot be empty")
+    user_id, client_key = check_chat_request(request, http_request, current_user, db)
 
     try:
-        return process_message(request.messages)
+        return await process_message(request.messages, user_id, client_key)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"AI service error: {str(e)}")
+
+
+@router.post("/jobs", response_model=JobCreatedResponse, status_code=202, dependencies=[Depends(limit_chat)])
+async def queue_message(
+    request: ChatRequest,
+    http_request: Request,
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    db: Session = Depends(get_db),
+):
+    """
+    Queue a message for processing in the background and return at once.
+
+    Poll /api/jobs/{job_id} or subscribe to /api/jobs/{job_id}/events;
+    the finished job's result is the ChatResponse. Anonymous callers get a
+    token that must be passed as ?token= to read the job.
+    """
+    user_id, client_key = check_chat_request(request, http_request, current_user, db)
+    payload = {
+        "messages": [message.model_dump() for message in request.messages],
+        "user_id": user_id,
+        "client_key": client_key,
+    }
+    token = secrets.token_urlsafe(32) if user_id is None else None
+    job = job_queue.enqueue(
+        db, "chat", payload, user_id=user_id, token_hash=hash_job_token(token) if token else None
+    )
+    return JobCreatedResponse(job_id=job.id, status=job.status, token=token)
@@ -0,0 +1,24 @@
+"""Template clause search routes."""
+
+from typing import Optional
+
+from fastapi import APIRouter, Query
+
+from models.clauses import ClauseSearchResponse
+from models.documents import DocumentType
+from services.clause_index import get_clause_index
+
+router = APIRouter(prefix="/api/clauses", tags=["clauses"])
+
+
+@router.get("/search", response_model=ClauseSearchResponse)
+async def search_clauses(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(10, ge=1, le=50),
+    document_type: Optional[DocumentType] = None,
+):
+    """Find template sections matching a query, best first, with snippets."""
+    results = get_clause_index().search(
+        q, limit=limit, document_type=document_type.value if document_type else None
+    )
+    return {"query": q, "results": results}
@@ -1,11 +1,12 @@
 """Document management routes."""
 
-import json
+from typing import Literal
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.orm import Session
 
-from database import get_db, User
+from database import get_db, SessionLocal, User
 from models.documents import (
     DocumentSaveRequest,
     DocumentUpdateRequest,
@@ -13,26 +14,45 @@ from models.documents import (
     DocumentListResponse,
 )
 from services.document_service import DocumentService
+from services.export_service import stream_ndjson, stream_zip
 from core.dependencies import get_current_user
+from core.serialization import dumps, loads, splice_json
+from core.tracing import span
 
 router = APIRouter(prefix="/api/documents", tags=["documents"])
 
 
-def document_to_response(doc) -> DocumentResponse:
-    """Convert a Document model to a DocumentResponse."""
+def document_to_json(doc) -> bytes:
+    """
+    Serialize a Document in the DocumentResponse shape.
+    The stored form_data JSON, validated when written, is passed through
+    without being parsed. Only text that isn't shaped like a JSON object is
+    parsed, to re-encode it or report the row as corrupted.
+    """
+    fields = {
+        "id": doc.id,
+        "document_type": doc.document_type,
+        "title": doc.title,
+        "created_at": doc.created_at.isoformat(),
+        "updated_at": doc.updated_at.isoformat(),
+    }
     try:
-        form_data = json.loads(doc.form_data)
-    except json.JSONDecodeError:
+        return splice_json(fields, "form_data", doc.form_data)
+    except ValueError:
+        pass
+
+    try:
+        form_data = loads(doc.form_data)
+    except ValueError:
+        form_data = None
+    if not isinstance(form_data, dict):
         raise HTTPException(status_code=500, detail=f"Document {doc.id} has corrupted data")
+    return splice_json(fields, "form_data", dumps(form_data).decode("utf-8"))
 
-    return DocumentResponse(
-        id=doc.id,
-        document_type=doc.document_type,
-        title=doc.title,
-        form_data=form_data,
-        created_at=doc.created_at.isoformat(),
-        updated_at=doc.updated_at.isoformat(),
-    )
+
+def json_response(body: bytes) -> Response:
+    """Wrap pre-serialized JSON in a response."""
+    return Response(content=body, media_type="application/json")
 
 
 @router.get("", response_model=DocumentListResponse)
@@ -43,9 +63,9 @@ async def get_documents(
     """Get all documents for the current user."""
     doc_service = DocumentService(db)
     documents = doc_service.get_user_documents(current_user.id)
-    return DocumentListResponse(
-        documents=[document_to_response(doc) for doc in documents]
-    )
+    with span("serialize documents", count=len(documents)):
+        body = b'{"documents":[' + b",".join(document_to_json(doc) for doc in documents) + b"]}"
+    return json_response(body)
 
 
 @router.post("", response_model=DocumentResponse)
@@ -62,7 +82,42 @@ async def save_document(
         request.title,
         request.form_data,
     )
-    return document_to_response(doc)
+    return json_response(document_to_json(doc))
+
+
+@router.get("/export")
+async def export_documents(
+    format: Literal["ndjson", "zip"] = "ndjson",
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Stream all documents for the current user as NDJSON or a ZIP archive.
+
+    The export uses its own database session so rows can keep streaming
+    from the cursor after the request dependencies have been torn down.
+    """
+    user_id = current_user.id
+    stream = stream_zip if format == "zip" else stream_ndjson
+
+    def generate():
+        db = SessionLocal()
+        try:
+            documents = DocumentService(db).iter_user_documents(user_id)
+            yield from stream(documents)
+        finally:
+            db.close()
+
+    if format == "zip":
+        return StreamingResponse(
+            generate(),
+            media_type="application/zip",
+            headers={"Content-Disposition": 'attachment; filename="documents.zip"'},
+        )
+    return StreamingResponse(
+        generate(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="documents.ndjson"'},
+    )
 
 
 @router.get("/{document_id}", response_model=DocumentResponse)
@@ -74,7 +129,7 @@ async def get_document(
     """Get a specific document."""
     doc_service = DocumentService(db)
     doc = doc_service.get_document(document_id, current_user.id)
-    return document_to_response(doc)
+    return json_response(document_to_json(doc))
 
 
 @router.put("/{document_id}", response_model=DocumentResponse)
@@ -92,7 +147,7 @@ async def update_document(
         request.title,
         request.form_data,
     )
-    return document_to_response(doc)
+    return json_response(document_to_json(doc))
 
 
 @router.delete("/{document_id}")
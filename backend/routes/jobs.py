@@ -0,0 +1,94 @@
+"""Background job status routes."""
+
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from database import get_db, Job, SessionLocal, User
+from models.jobs import JobResponse
+from services.job_queue import JOB_POLL_INTERVAL_SECONDS, TERMINAL_STATUSES, hash_job_token, job_queue
+from core.dependencies import get_current_user_optional
+from core.serialization import dumps, loads
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+
+def job_to_dict(job: Job) -> dict:
+    """Serialize a Job in the JobResponse shape."""
+    return {
+        "id": job.id,
+        "job_type": job.job_type,
+        "status": job.status,
+        "attempts": job.attempts,
+        "result": loads(job.result) if job.result else None,
+        "error": job.error,
+        "created_at": job.created_at.isoformat(),
+        "updated_at": job.updated_at.isoformat(),
+    }
+
+
+def can_read_job(job: Job, current_user: Optional[User], token: Optional[str]) -> bool:
+    """Users can read their own jobs; anonymous jobs need the token issued with them."""
+    if job.user_id is not None:
+        return current_user is not None and current_user.id == job.user_id
+    return bool(token and job.token_hash and hmac.compare_digest(hash_job_token(token), job.token_hash))
+
+
+def get_visible_job(db: Session, job_id: str, current_user: Optional[User], token: Optional[str]) -> Job:
+    """Load a job, hiding jobs the caller can't read."""
+    job = db.query(Job).filter(Job.id == job_id).first()
+    if job is None or not can_read_job(job, current_user, token):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: str,
+    token: Optional[str] = None,
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    db: Session = Depends(get_db),
+):
+    """Get the status, and once finished the result, of a background job."""
+    return job_to_dict(get_visible_job(db, job_id, current_user, token))
+
+
+@router.get("/{job_id}/events")
+async def job_events(
+    job_id: str,
+    token: Optional[str] = None,
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    db: Session = Depends(get_db),
+):
+    """Stream job status changes as server-sent events until the job finishes."""
+    get_visible_job(db, job_id, current_user, token)
+
+    async def events():
+        last_state = None
+        while True:
+            # Own session: the request's session is closed once streaming starts
+            session = SessionLocal()
+            try:
+                job = session.query(Job).filter(Job.id == job_id).first()
+                data = job_to_dict(job) if job is not None else None
+            finally:
+                session.close()
+            if data is None:
+                return
+
+            state = (data["status"], data["attempts"])
+            if state != last_state:
+                last_state = state
+                yield b"event: status\ndata: " + dumps(data) + b"\n\n"
+            if data["status"] in TERMINAL_STATUSES:
+                return
+            await job_queue.wait_for_update(job_id, JOB_POLL_INTERVAL_SECONDS)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,59 @@
+"""Admin-only on-demand profiling routes."""
+
+import asyncio
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import Response
+
+from models.profiler import ProfilerStartRequest, ProfilerStatusResponse
+from core.dependencies import get_admin_user
+from core.profiler import profiler
+
+router = APIRouter(prefix="/api/admin/profiler", tags=["admin"], dependencies=[Depends(get_admin_user)])
+
+
+@router.get("", response_model=ProfilerStatusResponse)
+async def profiler_status():
+    """Get the profiler's state and sample counts."""
+    return profiler.status()
+
+
+@router.post("/start", response_model=ProfilerStatusResponse)
+async def start_profiler(request: ProfilerStartRequest):
+    """Start a sampling session for a number of seconds, optionally filtered by path or header."""
+    try:
+        profiler.start(
+            request.seconds,
+            interval=request.interval_ms / 1000,
+            path_prefix=request.path_prefix,
+            header_name=request.header_name,
+            header_value=request.header_value,
+        )
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return profiler.status()
+
+
+@router.post("/stop", response_model=ProfilerStatusResponse)
+async def stop_profiler():
+    """Stop the current session early, keeping its samples."""
+    # Joining the sampler thread blocks, so keep it off the event loop
+    await asyncio.to_thread(profiler.stop)
+    return profiler.status()
+
+
+@router.get("/download")
+async def download_profile(format: Literal["collapsed", "pstats"] = "collapsed"):
+    """Download the latest session as collapsed stacks or a pstats file."""
+    if format == "pstats":
+        return Response(
+            content=profiler.pstats(),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": 'attachment; filename="profile.pstats"'},
+        )
+    return Response(
+        content=profiler.collapsed(),
+        media_type="text/plain",
+        headers={"Content-Disposition": 'attachment; filename="profile.collapsed.txt"'},
+    )
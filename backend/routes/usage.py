@@ -0,0 +1,29 @@
+"""LLM usage reporting routes."""
+
+from datetime import datetime, timedelta, timezone
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from database import get_db, User
+from models.usage import UsageSummaryResponse, UsageSummaryRow
+from services.usage_service import UsageService
+from core.dependencies import get_current_user
+
+router = APIRouter(prefix="/api/usage", tags=["usage"])
+
+
+@router.get("", response_model=UsageSummaryResponse)
+async def get_usage(
+    days: int = Query(30, ge=1, le=365),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Get the current user's LLM token usage, grouped by document type."""
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    rows = [UsageSummaryRow(**row) for row in UsageService(db).summarize(current_user.id, since)]
+    return UsageSummaryResponse(
+        days=days,
+        total_tokens=sum(row.prompt_tokens + row.completion_tokens for row in rows),
+        by_document_type=rows,
+    )
@@ -1,18 +1,49 @@
-"""AI service for legal document chat using LiteLLM with Cerebras via OpenRouter."""
+"""
+AI service for legal document chat using LiteLLM with Cerebras via OpenRouter.
 
-from litellm import completion
+LiteLLM is slow to import, so it is loaded on the first chat request
+(or by warm_up) rather than when this module is imported.
+"""
+
+import importlib.util
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import Optional
+
+import httpx
+from core.metrics import LLM_REQUEST_DURATION, LLM_TIME_TO_FIRST_BYTE, record_llm_usage
+from core.scheduler import llm_scheduler
+from core.tracing import span, traced
 from models.chat import Message, ChatResponse
-from models.documents import get_document_catalog_text, DocumentType
+from models.documents import get_document_catalog_text, DocumentType, DOCUMENT_CATALOG
+from services.clause_index import describe_clauses
+from services.document_classifier import classify_opening_message
+from services.field_extractor import describe_fields, extract_fields, merge_fields
+from services.usage_service import record_usage
 
 MODEL = "openrouter/openai/gpt-oss-120b"
 EXTRA_BODY = {"provider": {"order": ["cerebras"]}}
 
-DOCUMENT_CATALOG = get_document_catalog_text()
+# Connection pool for upstream LLM calls, shared across requests
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "10"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "120"))
+
+# Template clauses matching the user's last message added to the prompt; 0 disables
+PROMPT_CLAUSE_CONTEXT = int(os.getenv("PROMPT_CLAUSE_CONTEXT", "0"))
 
-SYSTEM_PROMPT = f"""You are a friendly legal assistant helping users create legal agreements.
+_http_client: Optional[httpx.AsyncClient] = None
+_http_transport: Optional[httpx.AsyncHTTPTransport] = None
+_llm_handler = None
+_litellm_lock = threading.Lock()
+
+SYSTEM_PROMPT_TEMPLATE = """You are a friendly legal assistant helping users create legal agreements.
 
 AVAILABLE DOCUMENT TYPES:
-{DOCUMENT_CATALOG}
+{catalog}
 
 YOUR JOB:
 1. First, determine what type of document the user needs through natural conversation
@@ -187,6 +218,84 @@ In the other fields, extract any information the user has provided so far.
 Only set isComplete to true when you have gathered all required information."""
 
 
+@lru_cache(maxsize=1)
+def get_system_prompt() -> str:
+    """Build the system prompt once, on first use."""
+    return SYSTEM_PROMPT_TEMPLATE.format(catalog=get_document_catalog_text())
+
+
+def load_litellm():
+    """Import LiteLLM and attach the pooled HTTP client to it."""
+    global _llm_handler
+    # Importing litellm from two threads at once (warm-up and a request) can deadlock
+    with _litellm_lock:
+        import litellm
+        from litellm.llms.custom_httpx.http_handler import AsyncHTTPHandler
+
+        if _llm_handler is None:
+            client = open_http_client()
+            # The handler's own client wraps the pooled transport, so it shares its connections
+            _llm_handler = AsyncHTTPHandler(
+                timeout=LLM_TIMEOUT, event_hooks=LLM_EVENT_HOOKS, transport=_http_transport
+            )
+            litellm.aclient_session = client
+    return litellm
+
+
+def warm_up() -> None:
+    """Load LiteLLM and build the system prompt ahead of the first request."""
+    load_litellm()
+    get_system_prompt()
+
+
+async def _mark_request_start(request: httpx.Request) -> None:
+    request.extensions["start_time"] = time.perf_counter()
+
+
+async def _record_first_byte(response: httpx.Response) -> None:
+    start = response.request.extensions.get("start_time")
+    if start is not None:
+        LLM_TIME_TO_FIRST_BYTE.observe(time.perf_counter() - start)
+
+
+LLM_EVENT_HOOKS = {"request": [_mark_request_start], "response": [_record_first_byte]}
+
+
+def open_http_client() -> httpx.AsyncClient:
+    """
+    Create the pooled HTTP client used for all LLM calls.
+    HTTP/2 is enabled when the optional h2 package is installed.
+    """
+    global _http_client, _http_transport
+    if _http_client is None:
+        _http_transport = httpx.AsyncHTTPTransport(
+            http2=importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(
+                max_connections=LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+            ),
+        )
+        _http_client = httpx.AsyncClient(
+            transport=_http_transport, timeout=LLM_TIMEOUT, event_hooks=LLM_EVENT_HOOKS
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the pooled HTTP client and release its connections."""
+    global _http_client, _http_transport, _llm_handler
+    if _http_client is not None:
+        if _llm_handler is not None:
+            import litellm
+            litellm.aclient_session = None
+            await _llm_handler.close()
+        await _http_client.aclose()
+        _http_client = None
+        _http_transport = None
+        _llm_handler = None
+
+
 def get_greeting() -> ChatResponse:
     """Return the initial greeting message."""
     return ChatResponse(
@@ -195,22 +304,86 @@ def get_greeting() -> ChatResponse:
     )
 
 
-def process_message(messages: list[Message]) -> ChatResponse:
-    """Process chat messages and return AI response with extracted fields."""
-    llm_messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+def detect_document_type(messages: list[Message]) -> Optional[ChatResponse]:
+    """
+    Answer the opening turn locally when the document type is obvious.
+    Returns None when the LLM should handle the message instead.
+    """
+    user_messages = [msg for msg in messages if msg.role == "user"]
+    if len(user_messages) != 1:
+        return None
+
+    doc_type = classify_opening_message(user_messages[0].content)
+    if doc_type is None:
+        return None
+
+    name = DOCUMENT_CATALOG[doc_type]["name"]
+    return ChatResponse(
+        response=f"Great, a {name} sounds like the right fit. To get started, which two companies are entering into this agreement, and what is it for?",
+        documentType=doc_type.value,
+        isComplete=False,
+    )
+
+
+@traced()
+async def process_message(
+    messages: list[Message], user_id: Optional[int] = None, client_key: str = "anonymous"
+) -> ChatResponse:
+    """
+    Process chat messages and return AI response with extracted fields.
+    Token usage is recorded against user_id (None for anonymous chats), and
+    client_key identifies the caller for fair scheduling of LLM calls.
+    """
+    extracted = extract_fields(messages)
+
+    fast_response = detect_document_type(messages)
+    if fast_response is not None:
+        return merge_fields(fast_response, extracted)
+
+    litellm = load_litellm()
+    llm_messages = [{"role": "system", "content": get_system_prompt()}]
     for msg in messages:
         llm_messages.append({"role": msg.role, "content": msg.content})
+    if extracted:
+        llm_messages.append({"role": "system", "content": describe_fields(extracted)})
+    if PROMPT_CLAUSE_CONTEXT > 0:
+        clauses = describe_clauses(messages[-1].content, PROMPT_CLAUSE_CONTEXT)
+        if clauses:
+            llm_messages.append({"role": "system", "content": clauses})
 
-    response = completion(
-        model=MODEL,
-        messages=llm_messages,
-        response_format=ChatResponse,
-        reasoning_effort="low",
-        extra_body=EXTRA_BODY
-    )
+    async with llm_scheduler.slot(client_key):
+        start = time.perf_counter()
+        try:
+            with span("litellm.acompletion", **{"llm.model": MODEL}) as llm_span:
+                response = await litellm.acompletion(
+                    model=MODEL,
+                    messages=llm_messages,
+                    response_format=ChatResponse,
+                    reasoning_effort="low",
+                    extra_body=EXTRA_BODY,
+                    client=_llm_handler,
+                )
+                usage = getattr(response, "usage", None)
+                if llm_span is not None and usage is not None:
+                    llm_span.set_attribute("llm.prompt_tokens", usage.prompt_tokens)
+                    llm_span.set_attribute("llm.completion_tokens", usage.completion_tokens)
+        except Exception:
+            LLM_REQUEST_DURATION.observe(time.perf_counter() - start, status="error")
+            raise
+        elapsed = time.perf_counter() - start
+    LLM_REQUEST_DURATION.observe(elapsed, status="ok")
+    record_llm_usage(usage)
 
     if not response.choices or not response.choices[0].message.content:
         raise ValueError("Invalid response from AI service")
 
-    result = response.choices[0].message.content
-    return ChatResponse.model_validate_json(result)
+    result = merge_fields(ChatResponse.model_validate_json(response.choices[0].message.content), extracted)
+    record_usage(
+        user_id=user_id,
+        document_type=result.documentType,
+        model=MODEL,
+        usage=usage,
+        latency_ms=int(elapsed * 1000),
+        cost_usd=getattr(response, "_hidden_params", {}).get("response_cost"),
+    )
+    return result
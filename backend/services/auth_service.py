@@ -6,6 +6,7 @@ from sqlalchemy.exc import IntegrityError
 
 from database import User
 from core.security import verify_password, get_password_hash, create_access_token
+from core.tracing import traced
 
 
 class AuthService:
@@ -14,6 +15,7 @@ class AuthService:
     def __init__(self, db: Session):
         self.db = db
 
+    @traced()
     def signup(self, email: str, password: str) -> tuple[User, str]:
         """
         Register a new user.
@@ -37,6 +39,7 @@ class AuthService:
         token = create_access_token(user.id, user.email)
         return user, token
 
+    @traced()
     def signin(self, email: str, password: str) -> tuple[User, str]:
         """
         Authenticate a user.
@@ -59,6 +62,7 @@ class AuthService:
         token = create_access_token(user.id, user.email)
         return user, token
 
+    @traced()
     def get_user_by_id(self, user_id: int) -> User:
         """
         Get user by ID.
@@ -0,0 +1,176 @@
+"""Inverted index and BM25 search over template clauses."""
+
+import heapq
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Optional
+
+from core.templates import load_catalog, read_template, split_sections
+from models.documents import DOCUMENT_CATALOG
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+# Heading words say what a clause is about, so they count more than body words
+HEADING_WEIGHT = 3
+# Bonus when the whole query appears verbatim, e.g. "limitation of liability"
+PHRASE_BOOST = 1.5
+SNIPPET_CHARS = 240
+
+STOPWORDS = {
+    "a", "an", "and", "any", "are", "as", "at", "be", "by", "for", "from", "if", "in", "is",
+    "it", "its", "may", "of", "on", "or", "such", "that", "the", "this", "to", "will", "with",
+}
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _stem(word: str) -> str:
+    """Fold simple plurals so "subprocessors" matches "subprocessor"."""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase, stemmed words without stopwords."""
+    return [_stem(w) for w in WORD_RE.findall(text.lower()) if w not in STOPWORDS]
+
+
+def _snippet(text: str, terms: set[str]) -> str:
+    """A window of text around the first query term it contains."""
+    start = 0
+    for match in WORD_RE.finditer(text.lower()):
+        if _stem(match.group()) in terms:
+            start = max(0, match.start() - SNIPPET_CHARS // 4)
+            break
+    snippet = text[start:start + SNIPPET_CHARS].strip()
+    if start > 0:
+        snippet = "…" + snippet
+    if start + SNIPPET_CHARS < len(text):
+        snippet += "…"
+    return snippet
+
+
+def _fill_heading_sections(sections: list[dict]) -> None:
+    """Give sections that are only a heading the text of their subsections."""
+    for i, section in enumerate(sections):
+        if not section["number"] or section["text"].rstrip(".") != section["heading"]:
+            continue
+        prefix = section["number"] + "."
+        children = []
+        for child in sections[i + 1:]:
+            if not child["number"].startswith(prefix):
+                break
+            children.append(child["text"])
+        if children:
+            section["text"] = " ".join([section["text"]] + children)
+
+
+class ClauseIndex:
+    """Clauses of every template, split by numbered section and heading."""
+
+    def __init__(self):
+        self.clauses = self._load_clauses()
+        self.postings: dict[str, list[tuple[int, int]]] = {}
+        self.lengths: list[int] = []
+
+        for clause_id, clause in enumerate(self.clauses):
+            counts = Counter(tokenize(clause["text"]))
+            for _ in range(HEADING_WEIGHT - 1):
+                counts.update(tokenize(clause["heading"]))
+            counts.update(tokenize(" ".join(clause["path"])))
+            for term, tf in counts.items():
+                self.postings.setdefault(term, []).append((clause_id, tf))
+            self.lengths.append(sum(counts.values()))
+
+        total = len(self.clauses)
+        self.average_length = sum(self.lengths) / total if total else 0.0
+        self.idf = {
+            term: math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self.postings.items()
+        }
+
+    @staticmethod
+    def _load_clauses() -> list[dict]:
+        """Split each catalog template into clauses linked to its catalog entry."""
+        document_types = {
+            filename: doc_type.value
+            for doc_type, info in DOCUMENT_CATALOG.items()
+            for filename in info["templates"]
+        }
+        clauses = []
+        for entry in load_catalog():
+            filename = entry["filename"]
+            sections = split_sections(read_template(filename))
+            _fill_heading_sections(sections)
+            for section in sections:
+                if not section["text"] and not section["heading"]:
+                    continue
+                clauses.append({
+                    **section,
+                    "text": section["text"] or section["heading"],
+                    "template": filename,
+                    "template_name": entry["name"],
+                    "document_type": document_types.get(filename),
+                })
+        return clauses
+
+    def search(self, query: str, limit: int = 10, document_type: Optional[str] = None) -> list[dict]:
+        """Return the best matching clauses with a snippet and score, best first."""
+        terms = set(tokenize(query))
+        scores: dict[int, float] = {}
+        for term in terms:
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for clause_id, tf in self.postings[term]:
+                norm = K1 * (1 - B + B * self.lengths[clause_id] / self.average_length)
+                scores[clause_id] = scores.get(clause_id, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+
+        phrase = " ".join(query.lower().split())
+        if len(terms) > 1:
+            for clause_id in scores:
+                clause = self.clauses[clause_id]
+                if phrase in clause["text"].lower() or phrase in clause["heading"].lower():
+                    scores[clause_id] *= PHRASE_BOOST
+
+        if document_type is not None:
+            scores = {i: s for i, s in scores.items() if self.clauses[i]["document_type"] == document_type}
+
+        results = []
+        for clause_id, score in heapq.nlargest(limit, scores.items(), key=lambda item: item[1]):
+            clause = self.clauses[clause_id]
+            results.append({
+                "template": clause["template"],
+                "template_name": clause["template_name"],
+                "document_type": clause["document_type"],
+                "number": clause["number"],
+                "heading": clause["heading"],
+                "path": clause["path"],
+                "snippet": _snippet(clause["text"], terms),
+                "score": round(score, 3),
+            })
+        return results
+
+
+@lru_cache(maxsize=1)
+def get_clause_index() -> ClauseIndex:
+    """Build the clause index once and reuse it."""
+    return ClauseIndex()
+
+
+def describe_clauses(text: str, limit: int) -> Optional[str]:
+    """Template clauses relevant to a message, formatted for the model, or None."""
+    results = get_clause_index().search(text, limit=limit)
+    if not results:
+        return None
+    lines = []
+    for r in results:
+        section = f" §{r['number']}" if r["number"] else ""
+        lines.append(f"- {r['template_name']}{section} {r['heading']}: {r['snippet']}")
+    return "Template clauses that may be relevant to the user's last message:\n" + "\n".join(lines)
@@ -0,0 +1,166 @@
+"""Local lexical classifier for picking a document type without the LLM."""
+
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Optional
+
+from core.templates import extract_headings, load_catalog, read_template
+from models.documents import DOCUMENT_CATALOG, DocumentType
+
+# Minimum cosine similarity for the best match to be trusted
+MIN_SCORE = 0.2
+# Best match must beat the runner-up by this factor
+MIN_MARGIN = 1.5
+# Longer opening messages usually carry details the LLM should extract
+MAX_FAST_PATH_WORDS = 30
+
+# Short names and acronyms people use that never appear in the templates
+KEYWORD_ALIASES = {
+    DocumentType.MUTUAL_NDA: ["nda", "mnda", "non disclosure", "confidentiality agreement", "confidential information"],
+    DocumentType.CLOUD_SERVICE: ["saas", "cloud", "subscription", "csa", "hosted software"],
+    DocumentType.PILOT: ["pilot", "trial", "poc", "proof of concept", "evaluation"],
+    DocumentType.DESIGN_PARTNER: ["design partner", "beta", "early access", "feedback program"],
+    DocumentType.SLA: ["sla", "uptime", "service level", "availability", "service credits"],
+    DocumentType.PROFESSIONAL_SERVICES: ["psa", "consulting", "consultant", "statement of work", "sow", "contractor"],
+    DocumentType.PARTNERSHIP: ["partnership", "partner", "reseller", "co marketing", "referral"],
+    DocumentType.SOFTWARE_LICENSE: ["software license", "on premise", "license", "licence", "eula", "installable"],
+    DocumentType.DPA: ["dpa", "gdpr", "data processing", "personal data", "subprocessors"],
+    DocumentType.BAA: ["baa", "hipaa", "phi", "protected health information", "business associate"],
+    DocumentType.AI_ADDENDUM: ["ai addendum", "artificial intelligence", "machine learning", "llm", "model training"],
+}
+# Longest first, so "design partner" is matched before "partner"
+ALIASES_LONGEST_FIRST = sorted(
+    ((alias, doc_type) for doc_type, aliases in KEYWORD_ALIASES.items() for alias in aliases),
+    key=lambda item: len(item[0]),
+    reverse=True,
+)
+
+# The fast path needs the message to ask for a document, not just mention a topic
+DOCUMENT_NOUNS = {
+    "agreement", "contract", "addendum", "license", "licence",
+    "nda", "mnda", "sla", "csa", "psa", "sow", "dpa", "baa", "eula",
+}
+# Documents we don't offer; the LLM suggests the closest one instead
+UNSUPPORTED_DOCUMENTS = [
+    "terms of service", "terms of use", "terms and conditions", "privacy policy", "cookie policy",
+    "employment", "offer letter", "lease", "operating agreement", "shareholder", "stock purchase",
+    "asset purchase", "term sheet", "safe", "convertible note", "loan", "purchase order", "invoice",
+]
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "i", "in", "is", "it",
+    "me", "my", "need", "of", "on", "or", "our", "some", "that", "the", "this", "to", "we",
+    "with", "want", "would", "like", "help", "create", "draft", "you", "can", "please",
+}
+
+# Negations and comparisons need the LLM to interpret ("not an NDA, a ...")
+DEFER_WORDS = {"not", "no", "don", "dont", "instead", "rather", "or", "vs", "versus", "which"}
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase unigram and bigram features, ignoring stopwords."""
+    words = [w for w in WORD_RE.findall(text.lower()) if w not in STOPWORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class DocumentClassifier:
+    """TF-IDF classifier over document descriptions, aliases and template headings."""
+
+    def __init__(self):
+        corpus = self._build_corpus()
+        doc_freq = Counter(term for counts in corpus.values() for term in counts)
+        total = len(corpus)
+        self.idf = {term: math.log(total / df) for term, df in doc_freq.items()}
+        self.vectors = {
+            doc_type: self._normalize({t: tf * self.idf[t] for t, tf in counts.items()})
+            for doc_type, counts in corpus.items()
+        }
+
+    @staticmethod
+    def _build_corpus() -> dict[DocumentType, Counter]:
+        """Collect weighted term counts for each document type."""
+        catalog_by_file = {entry["filename"]: entry for entry in load_catalog()}
+        corpus = {}
+        for doc_type, info in DOCUMENT_CATALOG.items():
+            counts = Counter()
+            counts.update(tokenize(info["name"]) * 3)
+            counts.update(tokenize(info["description"]) * 2)
+            for alias in KEYWORD_ALIASES.get(doc_type, []):
+                counts.update(tokenize(alias) * 4)
+            for filename in info["templates"]:
+                entry = catalog_by_file.get(filename)
+                if entry:
+                    counts.update(tokenize(entry["description"]) * 2)
+                for heading in extract_headings(read_template(filename)):
+                    counts.update(tokenize(heading))
+            corpus[doc_type] = counts
+        return corpus
+
+    @staticmethod
+    def _normalize(vector: dict[str, float]) -> dict[str, float]:
+        norm = math.sqrt(sum(v * v for v in vector.values()))
+        if not norm:
+            return vector
+        return {t: v / norm for t, v in vector.items()}
+
+    def scores(self, text: str) -> list[tuple[DocumentType, float]]:
+        """Return (document type, cosine similarity) pairs, best first."""
+        query = self._normalize(
+            {t: tf * self.idf[t] for t, tf in Counter(tokenize(text)).items() if t in self.idf}
+        )
+        ranked = [
+            (doc_type, sum(weight * vector.get(t, 0.0) for t, weight in query.items()))
+            for doc_type, vector in self.vectors.items()
+        ]
+        return sorted(ranked, key=lambda item: item[1], reverse=True)
+
+    def classify(self, text: str) -> Optional[DocumentType]:
+        """Return the document type if the match is confident, otherwise None."""
+        ranked = self.scores(text)
+        (best, best_score), (_, second_score) = ranked[0], ranked[1]
+        if best_score < MIN_SCORE or best_score < second_score * MIN_MARGIN:
+            return None
+        return best
+
+
+@lru_cache(maxsize=1)
+def get_classifier() -> DocumentClassifier:
+    """Build the classifier once and reuse it."""
+    return DocumentClassifier()
+
+
+def _mentioned_types(phrase_text: str) -> set[DocumentType]:
+    """Document types whose aliases appear in the text, ignoring aliases inside longer ones."""
+    mentioned = set()
+    for alias, doc_type in ALIASES_LONGEST_FIRST:
+        if f" {alias} " in phrase_text:
+            mentioned.add(doc_type)
+            phrase_text = phrase_text.replace(f" {alias} ", " | ")
+    return mentioned
+
+
+def classify_opening_message(text: str) -> Optional[DocumentType]:
+    """
+    Classify a short opening message, or return None to defer to the LLM.
+    Only messages that name a document, mention at most one catalog type
+    and no document outside the catalog take the fast path.
+    """
+    words = WORD_RE.findall(text.lower())
+    if len(words) > MAX_FAST_PATH_WORDS or DEFER_WORDS.intersection(words):
+        return None
+    if not DOCUMENT_NOUNS.intersection(words):
+        return None
+    phrase_text = f" {' '.join(words)} "
+    if any(f" {phrase} " in phrase_text for phrase in UNSUPPORTED_DOCUMENTS):
+        return None
+    mentioned = _mentioned_types(phrase_text)
+    if len(mentioned) > 1:
+        return None
+    doc_type = get_classifier().classify(text)
+    if mentioned and doc_type not in mentioned:
+        return None
+    return doc_type
@@ -1,10 +1,12 @@
 """Document management business logic."""
 
-import json
+from typing import Iterator
 
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 
+from core.serialization import dumps
+from core.tracing import traced
 from database import Document
 
 
@@ -14,6 +16,7 @@ class DocumentService:
     def __init__(self, db: Session):
         self.db = db
 
+    @traced()
     def save_document(
         self, user_id: int, document_type: str, title: str, form_data: dict
     ) -> Document:
@@ -22,13 +25,14 @@ class DocumentService:
             user_id=user_id,
             document_type=document_type,
             title=title,
-            form_data=json.dumps(form_data),
+            form_data=dumps(form_data).decode("utf-8"),
         )
         self.db.add(doc)
         self.db.commit()
         self.db.refresh(doc)
         return doc
 
+    @traced()
     def get_user_documents(self, user_id: int) -> list[Document]:
         """Get all documents for a user, sorted by most recently updated."""
         return (
@@ -38,6 +42,19 @@ class DocumentService:
             .all()
         )
 
+    def iter_user_documents(self, user_id: int, batch_size: int = 100) -> Iterator[Document]:
+        """
+        Iterate over all documents for a user without loading them all at once.
+        Rows are fetched from a server-side cursor in batches of batch_size.
+        """
+        return (
+            self.db.query(Document)
+            .filter(Document.user_id == user_id)
+            .order_by(Document.id)
+            .yield_per(batch_size)
+        )
+
+    @traced()
     def get_document(self, document_id: int, user_id: int) -> Document:
         """Get a specific document. Raises 404 if not found or not owned by user."""
         doc = (
@@ -49,17 +66,19 @@ class DocumentService:
             raise HTTPException(status_code=404, detail="Document not found")
         return doc
 
+    @traced()
     def update_document(
         self, document_id: int, user_id: int, title: str, form_data: dict
     ) -> Document:
         """Update an existing document."""
         doc = self.get_document(document_id, user_id)
         doc.title = title
-        doc.form_data = json.dumps(form_data)
+        doc.form_data = dumps(form_data).decode("utf-8")
         self.db.commit()
         self.db.refresh(doc)
         return doc
 
+    @traced()
     def delete_document(self, document_id: int, user_id: int) -> None:
         """Delete a document."""
         doc = self.get_document(document_id, user_id)
@@ -0,0 +1,76 @@
+"""Streaming export of a user's documents as NDJSON or ZIP."""
+
+import json
+import re
+import zipfile
+from typing import Iterable, Iterator
+
+from database import Document
+
+
+def document_record(doc: Document) -> dict:
+    """Convert a Document model to a plain dict for export."""
+    try:
+        form_data = json.loads(doc.form_data)
+    except json.JSONDecodeError:
+        form_data = None
+
+    return {
+        "id": doc.id,
+        "document_type": doc.document_type,
+        "title": doc.title,
+        "form_data": form_data,
+        "created_at": doc.created_at.isoformat(),
+        "updated_at": doc.updated_at.isoformat(),
+    }
+
+
+def stream_ndjson(documents: Iterable[Document]) -> Iterator[bytes]:
+    """Yield one JSON line per document."""
+    for doc in documents:
+        yield (json.dumps(document_record(doc)) + "\n").encode("utf-8")
+
+
+class _ChunkBuffer:
+    """Write-only, unseekable sink that lets zipfile stream into chunks."""
+
+    def __init__(self):
+        self.chunks: list[bytes] = []
+        self.offset = 0
+
+    def write(self, data: bytes) -> int:
+        self.chunks.append(bytes(data))
+        self.offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.offset
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _archive_name(doc: Document) -> str:
+    """Build a filesystem-safe archive entry name for a document."""
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", doc.title).strip("-").lower() or "document"
+    return f"{doc.id}-{slug[:60]}.json"
+
+
+def stream_zip(documents: Iterable[Document]) -> Iterator[bytes]:
+    """
+    Yield a ZIP archive with one JSON file per document.
+    Each entry is flushed as soon as it is written, so memory use stays
+    bounded by a single document regardless of how many are exported.
+    """
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for doc in documents:
+            content = json.dumps(document_record(doc), indent=2)
+            archive.writestr(_archive_name(doc), content)
+            yield buffer.drain()
+    yield buffer.drain()
@@ -0,0 +1,239 @@
+"""Deterministic extraction of easy-to-parse fields from user messages."""
+
+import re
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from models.chat import ChatResponse, Message, PartyInfoExtraction
+from models.documents import DocumentType
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+MONTHS = [
+    "january", "february", "march", "april", "may", "june",
+    "july", "august", "september", "october", "november", "december",
+]
+NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+}
+
+# Fields that only make sense for a single document type
+TYPE_SPECIFIC_FIELDS = {
+    "mndaTermType": DocumentType.MUTUAL_NDA,
+    "mndaTermYears": DocumentType.MUTUAL_NDA,
+    "confidentialityTermType": DocumentType.MUTUAL_NDA,
+    "confidentialityTermYears": DocumentType.MUTUAL_NDA,
+    "uptimeTarget": DocumentType.SLA,
+    "generalCapAmount": DocumentType.PILOT,
+}
+
+SENTENCE_RE = re.compile(r"[!?\n;]+|\.(?=\s|$)|,\s+(?=[a-z])")
+# Numbers in one clause don't describe keywords in another, e.g. "fees are $5,000 and liability is capped at ..."
+CLAUSE_RE = re.compile(r"\s+(?:and|but|while|whereas|if|unless|when|because)\s+")
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+ISO_DATE_RE = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b")
+MONTH_FIRST_RE = re.compile(rf"\b({'|'.join(MONTHS)})\s+(\d{{1,2}})(?:st|nd|rd|th)?,?\s+(\d{{4}})\b")
+DAY_FIRST_RE = re.compile(rf"\b(\d{{1,2}})(?:st|nd|rd|th)?\s+({'|'.join(MONTHS)}),?\s+(\d{{4}})\b")
+NEXT_WEEKDAY_RE = re.compile(rf"\bnext\s+({'|'.join(WEEKDAYS)})\b")
+YEARS_RE = re.compile(rf"\b(\d{{1,2}}|{'|'.join(NUMBER_WORDS)})[\s-]+years?\b")
+PERCENT_RE = re.compile(r"\b(\d{2,3}(?:\.\d+)?)\s*(?:%|percent\b)")
+CAP_CONTEXT_RE = re.compile(r"\b(cap|capped|liability|limit)\b")
+CURRENCY_RE = re.compile(r"(?:\$|\busd\s*)(\d[\d,]*(?:\.\d{2})?)|\b(\d[\d,]*(?:\.\d{2})?)\s*(?:dollars|usd)\b")
+
+DATE_CONTEXT_RE = re.compile(r"\b(effective|start|starts|starting|begin|begins|commence|as of|date)\b")
+# "from" only signals a start date when the date follows it, unlike "a company from Delaware"
+FROM_DATE_RE = re.compile(rf"\bfrom\s+(?:today|tomorrow|next\s+(?:{'|'.join(WEEKDAYS)})|\d|(?:{'|'.join(MONTHS)})\b)")
+# Whose notice address an email is; "i" also matches "i'm"
+OWN_PARTY_RE = re.compile(r"\b(i|me|my|mine|we|our|ours|us)\b")
+OTHER_PARTY_RE = re.compile(r"\b(they|them|their|theirs)\b")
+# Names the other side outright, even next to "our" or "my"
+COUNTERPARTY_RE = re.compile(r"\b(counterparty|other party|other side)\b")
+BARE_DATE_RE = re.compile(r"^\s*(?:let's say |make it |starting )?(today|tomorrow|next \w+)\W*$")
+
+
+def _split_sentences(text: str) -> list[str]:
+    return [s.strip() for s in SENTENCE_RE.split(text.lower()) if s.strip()]
+
+
+def parse_date(text: str, today: date) -> Optional[str]:
+    """Parse an absolute or relative date into YYYY-MM-DD."""
+    match = ISO_DATE_RE.search(text)
+    if match:
+        try:
+            return date(*map(int, match.groups())).isoformat()
+        except ValueError:
+            return None
+
+    match = MONTH_FIRST_RE.search(text)
+    if match:
+        month, day, year = match.groups()
+        return _build_date(int(year), MONTHS.index(month) + 1, int(day))
+
+    match = DAY_FIRST_RE.search(text)
+    if match:
+        day, month, year = match.groups()
+        return _build_date(int(year), MONTHS.index(month) + 1, int(day))
+
+    match = NEXT_WEEKDAY_RE.search(text)
+    if match:
+        days_ahead = (WEEKDAYS.index(match.group(1)) - today.weekday()) % 7 or 7
+        return (today + timedelta(days=days_ahead)).isoformat()
+
+    if re.search(r"\btomorrow\b", text):
+        return (today + timedelta(days=1)).isoformat()
+    if re.search(r"\btoday\b", text):
+        return today.isoformat()
+    return None
+
+
+def _build_date(year: int, month: int, day: int) -> Optional[str]:
+    try:
+        return date(year, month, day).isoformat()
+    except ValueError:
+        return None
+
+
+def _parse_years(match: re.Match) -> int:
+    value = match.group(1)
+    return NUMBER_WORDS.get(value) or int(value)
+
+
+def _format_currency(amount: str) -> str:
+    value = float(amount.replace(",", ""))
+    if value.is_integer():
+        return f"${int(value):,}"
+    return f"${value:,.2f}"
+
+
+def _clauses(sentence: str) -> list[str]:
+    return [c for c in CLAUSE_RE.split(sentence) if c]
+
+
+def _only(values: set):
+    """The value if every candidate agrees, otherwise None."""
+    return next(iter(values)) if len(values) == 1 else None
+
+
+def extract_from_text(text: str, today: date) -> dict:
+    """
+    Extract confident field values from a single user message.
+    Numbers only count for a keyword in the same clause, and a field is
+    left for the model when its clauses disagree.
+    """
+    fields = {}
+    candidates: dict[str, set] = {}
+    original_emails = {email.lower(): email for email in EMAIL_RE.findall(text)}
+
+    for sentence in _split_sentences(text):
+        if "effectiveDate" not in fields and (
+            DATE_CONTEXT_RE.search(sentence) or FROM_DATE_RE.search(sentence) or BARE_DATE_RE.match(sentence)
+        ):
+            parsed = parse_date(sentence, today)
+            if parsed:
+                fields["effectiveDate"] = parsed
+
+        for clause in _clauses(sentence):
+            years = {_parse_years(m) for m in YEARS_RE.finditer(clause)}
+            if "confidential" in clause:
+                if re.search(r"\bperpetu(ity|al|ally)\b", clause):
+                    candidates.setdefault("confidentialityTerm", set()).add(("perpetuity", None))
+                for value in years:
+                    candidates.setdefault("confidentialityTerm", set()).add(("years", value))
+            elif re.search(r"\bterm\b", clause):
+                candidates.setdefault("mndaTermYears", set()).update(years)
+
+            if re.search(r"\b(uptime|availability|available)\b", clause):
+                candidates.setdefault("uptimeTarget", set()).update(
+                    f"{m.group(1)}%" for m in PERCENT_RE.finditer(clause) if float(m.group(1)) <= 100
+                )
+
+            if CAP_CONTEXT_RE.search(clause):
+                candidates.setdefault("generalCapAmount", set()).update(
+                    _format_currency(m.group(1) or m.group(2)) for m in CURRENCY_RE.finditer(clause)
+                )
+
+            emails = EMAIL_RE.findall(clause)
+            if emails:
+                own, other = OWN_PARTY_RE.search(clause), OTHER_PARTY_RE.search(clause)
+                if COUNTERPARTY_RE.search(clause) or (other and not own):
+                    party = "party2"
+                elif own and not other:
+                    party = "party1"
+                else:
+                    party = None
+                if party:
+                    candidates.setdefault(party, set()).update(original_emails.get(e, e) for e in emails)
+
+    confidentiality = _only(candidates.get("confidentialityTerm", set()))
+    if confidentiality:
+        fields["confidentialityTermType"], years = confidentiality
+        if years:
+            fields["confidentialityTermYears"] = years
+    mnda_years = _only(candidates.get("mndaTermYears", set()))
+    if mnda_years:
+        fields["mndaTermType"] = "expires"
+        fields["mndaTermYears"] = mnda_years
+    for key in ("uptimeTarget", "generalCapAmount"):
+        value = _only(candidates.get(key, set()))
+        if value:
+            fields[key] = value
+    for party in ("party1", "party2"):
+        email = _only(candidates.get(party, set()))
+        if email:
+            fields[party] = {"noticeAddress": email}
+
+    return fields
+
+
+def extract_fields(messages: list[Message], today: Optional[date] = None) -> dict:
+    """
+    Extract fields from every user message in the conversation.
+    Later messages override earlier ones. Notice emails are only assigned
+    when their clause says whose they are: the user's own (party1) or the
+    counterparty's (party2).
+    """
+    today = today or datetime.now().date()
+    fields = {}
+
+    for msg in messages:
+        if msg.role == "user":
+            fields.update(extract_from_text(msg.content, today))
+
+    return fields
+
+
+def describe_fields(fields: dict) -> str:
+    """Describe locally extracted fields for the model."""
+    lines = []
+    for key, value in fields.items():
+        if isinstance(value, dict):
+            for sub_key, sub_value in value.items():
+                lines.append(f"- {key}.{sub_key}: {sub_value}")
+        else:
+            lines.append(f"- {key}: {value}")
+    return (
+        "These values were picked out of the user's messages automatically and may be wrong. "
+        "Use them unless the conversation says otherwise, and confirm them with the user "
+        "rather than asking for them from scratch:\n"
+        + "\n".join(lines)
+    )
+
+
+def merge_fields(response: ChatResponse, fields: dict) -> ChatResponse:
+    """Fill fields the response left empty with locally extracted values."""
+    updates = {}
+    for key, value in fields.items():
+        doc_type = TYPE_SPECIFIC_FIELDS.get(key)
+        if doc_type is not None and response.documentType != doc_type.value:
+            continue
+
+        current = getattr(response, key)
+        if isinstance(value, dict):
+            party = current or PartyInfoExtraction()
+            missing = {k: v for k, v in value.items() if getattr(party, k) is None}
+            if missing:
+                updates[key] = party.model_copy(update=missing)
+        elif current is None:
+            updates[key] = value
+
+    return response.model_copy(update=updates) if updates else response
@@ -0,0 +1,275 @@
+"""
+Embedded background job queue.
+
+Jobs are rows in the jobs table, so they survive restarts and are shared by
+every worker process. Each process runs a fixed number of worker tasks per
+job type, which caps how many jobs of that type run at once. A claimed job is
+leased for its visibility timeout; if the process running it dies, the lease
+expires and the job is picked up again.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.orm import Session
+
+from core.serialization import dumps, loads
+from database import Job, SessionLocal
+
+logger = logging.getLogger(__name__)
+
+JOB_POLL_INTERVAL_SECONDS = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "1.0"))
+# Finished jobs are deleted this long after they finish; 0 keeps them forever
+JOB_RETENTION_HOURS = float(os.getenv("JOB_RETENTION_HOURS", "24"))
+JOB_PRUNE_INTERVAL_SECONDS = 3600.0
+JOB_RETRY_BASE_SECONDS = 2.0
+JOB_RETRY_MAX_SECONDS = 300.0
+# Claims lost to another worker before giving up until the next poll
+CLAIM_ATTEMPTS = 3
+
+TERMINAL_STATUSES = frozenset({"succeeded", "failed"})
+
+JobHandler = Callable[[dict], Awaitable[dict]]
+
+
+class JobType:
+    """A registered kind of job and its limits."""
+
+    __slots__ = ("name", "handler", "concurrency", "max_attempts", "visibility_timeout")
+
+    def __init__(self, name: str, handler: JobHandler, concurrency: int, max_attempts: int, visibility_timeout: float):
+        self.name = name
+        self.handler = handler
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.visibility_timeout = visibility_timeout
+
+
+def hash_job_token(token: str) -> str:
+    """Digest stored for the secret that grants access to an anonymous job."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _claimable(job_type: str, now: datetime):
+    return and_(
+        Job.job_type == job_type,
+        or_(
+            and_(Job.status == "queued", Job.run_after <= now),
+            # Lease expired: the worker running it died or was killed
+            and_(Job.status == "running", Job.locked_until < now),
+        ),
+    )
+
+
+def _claim(job_type: JobType) -> Optional[tuple[str, dict, int]]:
+    """Lease the next runnable job. Returns (id, payload, attempt) or None."""
+    db = SessionLocal()
+    try:
+        for _ in range(CLAIM_ATTEMPTS):
+            now = _now()
+            claimable = _claimable(job_type.name, now)
+            candidate = db.execute(
+                select(Job.id, Job.payload, Job.attempts, Job.max_attempts)
+                .where(claimable)
+                .order_by(Job.run_after)
+                .limit(1)
+            ).first()
+            if candidate is None:
+                return None
+
+            if candidate.attempts >= candidate.max_attempts:
+                # Only reachable for expired leases on the final attempt
+                values = {"status": "failed", "error": "Job timed out", "locked_until": None}
+            else:
+                values = {
+                    "status": "running",
+                    "attempts": Job.attempts + 1,
+                    "locked_until": now + timedelta(seconds=job_type.visibility_timeout),
+                }
+            # The claimable condition again makes this a no-op if another worker got there first
+            claimed = db.execute(update(Job).where(Job.id == candidate.id, claimable).values(**values)).rowcount
+            db.commit()
+            if claimed and values["status"] == "running":
+                return candidate.id, loads(candidate.payload), candidate.attempts + 1
+        return None
+    finally:
+        db.close()
+
+
+def _update(job_id: str, **values) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(update(Job).where(Job.id == job_id).values(**values))
+        db.commit()
+    finally:
+        db.close()
+
+
+def prune_finished_jobs(retention_hours: float = JOB_RETENTION_HOURS) -> int:
+    """Delete succeeded and failed jobs older than the retention period. Returns the number deleted."""
+    cutoff = _now() - timedelta(hours=retention_hours)
+    db = SessionLocal()
+    try:
+        deleted = db.execute(
+            delete(Job).where(Job.status.in_(TERMINAL_STATUSES), Job.updated_at < cutoff)
+        ).rowcount
+        db.commit()
+        return deleted
+    finally:
+        db.close()
+
+
+class JobQueue:
+    """Registry of job types and the worker tasks that run them."""
+
+    def __init__(self):
+        self.job_types: dict[str, JobType] = {}
+        self.tasks: list[asyncio.Task] = []
+        self.wakeups: dict[str, asyncio.Event] = {}
+        self.watchers: dict[str, set[asyncio.Event]] = {}
+
+    def handler(self, name: str, concurrency: int = 1, max_attempts: int = 3, visibility_timeout: float = 300.0):
+        """Register an async function(payload) -> result dict as the handler for a job type."""
+
+        def decorator(func: JobHandler) -> JobHandler:
+            self.job_types[name] = JobType(name, func, concurrency, max_attempts, visibility_timeout)
+            return func
+
+        return decorator
+
+    def start(self, prune: bool = False) -> None:
+        """
+        Start the worker tasks for every registered job type.
+        With prune, also delete old finished jobs periodically; only one
+        process should do this.
+        """
+        for job_type in self.job_types.values():
+            self.wakeups[job_type.name] = asyncio.Event()
+            for _ in range(job_type.concurrency):
+                self.tasks.append(asyncio.create_task(self._work(job_type)))
+        if prune and JOB_RETENTION_HOURS > 0:
+            self.tasks.append(asyncio.create_task(self._prune()))
+
+    async def stop(self) -> None:
+        """Stop the workers. Jobs they were running are handed back to the queue."""
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    def enqueue(
+        self,
+        db: Session,
+        job_type: str,
+        payload: dict,
+        user_id: Optional[int] = None,
+        token_hash: Optional[str] = None,
+    ) -> Job:
+        """Store a new job and wake a local worker for it. See hash_job_token for token_hash."""
+        if job_type not in self.job_types:
+            raise ValueError(f"Unknown job type: {job_type}")
+        job = Job(
+            id=uuid.uuid4().hex,
+            job_type=job_type,
+            user_id=user_id,
+            token_hash=token_hash,
+            payload=dumps(payload).decode("utf-8"),
+            max_attempts=self.job_types[job_type].max_attempts,
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        wakeup = self.wakeups.get(job_type)
+        if wakeup is not None:
+            wakeup.set()
+        return job
+
+    async def wait_for_update(self, job_id: str, timeout: float) -> None:
+        """
+        Wait until this process changes the job's state, or until timeout.
+        Changes made by other worker processes are only seen by polling.
+        """
+        event = asyncio.Event()
+        watchers = self.watchers.setdefault(job_id, set())
+        watchers.add(event)
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            watchers.discard(event)
+            if not watchers:
+                self.watchers.pop(job_id, None)
+
+    def _notify(self, job_id: str) -> None:
+        for event in self.watchers.get(job_id, ()):
+            event.set()
+
+    async def _work(self, job_type: JobType) -> None:
+        wakeup = self.wakeups[job_type.name]
+        while True:
+            try:
+                claimed = await asyncio.to_thread(_claim, job_type)
+            except Exception:
+                logger.exception("Failed to claim %s job", job_type.name)
+                claimed = None
+
+            if claimed is None:
+                wakeup.clear()
+                try:
+                    await asyncio.wait_for(wakeup.wait(), JOB_POLL_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._run(job_type, *claimed)
+
+    async def _prune(self) -> None:
+        while True:
+            try:
+                deleted = await asyncio.to_thread(prune_finished_jobs)
+                if deleted:
+                    logger.info("Deleted %d finished jobs older than %g hours", deleted, JOB_RETENTION_HOURS)
+            except Exception:
+                logger.exception("Failed to delete old jobs")
+            await asyncio.sleep(JOB_PRUNE_INTERVAL_SECONDS)
+
+    async def _run(self, job_type: JobType, job_id: str, payload: dict, attempt: int) -> None:
+        self._notify(job_id)
+        try:
+            result = await asyncio.wait_for(job_type.handler(payload), job_type.visibility_timeout)
+        except asyncio.CancelledError:
+            # Shutting down: hand the job back without counting this attempt
+            await asyncio.to_thread(
+                _update, job_id, status="queued", attempts=Job.attempts - 1, locked_until=None
+            )
+            raise
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            if attempt < job_type.max_attempts:
+                delay = min(JOB_RETRY_BASE_SECONDS * 2 ** (attempt - 1), JOB_RETRY_MAX_SECONDS)
+                values = {"status": "queued", "error": error, "run_after": _now() + timedelta(seconds=delay)}
+            else:
+                values = {"status": "failed", "error": error}
+            logger.warning("%s job %s failed (attempt %d): %s", job_type.name, job_id, attempt, error)
+        else:
+            values = {"status": "succeeded", "result": dumps(result).decode("utf-8"), "error": None}
+
+        try:
+            await asyncio.to_thread(_update, job_id, locked_until=None, **values)
+        except Exception:
+            logger.exception("Failed to record result of job %s", job_id)
+        self._notify(job_id)
+
+
+job_queue = JobQueue()
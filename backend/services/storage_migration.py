@@ -0,0 +1,64 @@
+"""Background rewrite of stored form_data into the configured encoding."""
+
+import logging
+import threading
+from typing import Optional
+
+from sqlalchemy import func, select, update
+
+from core.compression import FORM_DATA_COMPRESSION, encode_form_data
+from core.serialization import loads
+from database import Document, SessionLocal
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_BATCH_SIZE = 200
+
+
+def migrate_form_data(stop: Optional[threading.Event] = None, batch_size: int = MIGRATION_BATCH_SIZE) -> int:
+    """
+    Re-encode documents whose storage format doesn't match FORM_DATA_COMPRESSION.
+    Works in small committed batches and stops early when stop is set.
+    Returns the number of rows rewritten.
+    """
+    # Compressed rows are BLOBs, plain JSON rows are TEXT
+    wrong_type = "text" if FORM_DATA_COMPRESSION == "zlib" else "blob"
+    rewritten = 0
+    last_id = 0
+
+    while stop is None or not stop.is_set():
+        db = SessionLocal()
+        try:
+            rows = db.execute(
+                select(Document.id, Document.form_data)
+                .where(Document.id > last_id, func.typeof(Document.form_data) == wrong_type)
+                .order_by(Document.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+
+            for doc_id, form_data in rows:
+                try:
+                    loads(form_data)
+                except ValueError:
+                    # Writes reject invalid JSON; leave the row for the API to report as corrupted
+                    logger.warning("Skipping document %d: form_data is not valid JSON", doc_id)
+                    continue
+                # Small documents stay as text even when compression is on
+                if isinstance(encode_form_data(form_data), str) and wrong_type == "text":
+                    continue
+                db.execute(
+                    update(Document)
+                    .where(Document.id == doc_id)
+                    .values(form_data=form_data, updated_at=Document.updated_at)
+                )
+                rewritten += 1
+            db.commit()
+            last_id = rows[-1][0]
+        finally:
+            db.close()
+
+    if rewritten:
+        logger.info("Re-encoded form_data for %d documents", rewritten)
+    return rewritten
@@ -0,0 +1,169 @@
+"""LLM token and cost accounting."""
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from database import LLMUsage, SessionLocal
+
+logger = logging.getLogger(__name__)
+
+USAGE_BATCH_SIZE = 50
+USAGE_FLUSH_INTERVAL_SECONDS = 2.0
+USAGE_QUEUE_SIZE = 10_000
+
+# Tokens a signed-in user may use per rolling 30 days; 0 disables the quota
+USER_MONTHLY_TOKEN_QUOTA = int(os.getenv("USER_MONTHLY_TOKEN_QUOTA", "0"))
+
+
+class UsageRecorder:
+    """Buffers usage records and writes them in batches from a background task."""
+
+    def __init__(self):
+        self.queue: Optional[asyncio.Queue] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self.queue = asyncio.Queue(maxsize=USAGE_QUEUE_SIZE)
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the writer and flush anything still queued."""
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        while not self.queue.empty():
+            await self._flush(self._drain())
+        self.task = None
+
+    def record(self, **fields) -> None:
+        """Queue a usage record without waiting for the database."""
+        if self.queue is None:
+            return
+        try:
+            self.queue.put_nowait(fields)
+        except asyncio.QueueFull:
+            logger.warning("Usage queue full, dropping record")
+
+    def _drain(self) -> list[dict]:
+        batch = []
+        while not self.queue.empty() and len(batch) < USAGE_BATCH_SIZE:
+            batch.append(self.queue.get_nowait())
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            first = await self.queue.get()
+            try:
+                await asyncio.sleep(USAGE_FLUSH_INTERVAL_SECONDS)
+            except asyncio.CancelledError:
+                # Shutting down: first is no longer in the queue for stop() to flush
+                await self._flush([first])
+                raise
+            await self._flush([first] + self._drain())
+            while not self.queue.empty():
+                await self._flush(self._drain())
+
+    async def _flush(self, batch: list[dict]) -> None:
+        if not batch:
+            return
+        try:
+            await asyncio.to_thread(_insert_batch, batch)
+        except Exception:
+            logger.exception("Failed to write %d usage records", len(batch))
+
+
+def _insert_batch(batch: list[dict]) -> None:
+    db = SessionLocal()
+    try:
+        db.add_all(LLMUsage(**fields) for fields in batch)
+        db.commit()
+    finally:
+        db.close()
+
+
+usage_recorder = UsageRecorder()
+
+
+def record_usage(
+    user_id: Optional[int],
+    document_type: Optional[str],
+    model: str,
+    usage,
+    latency_ms: int,
+    cost_usd: Optional[float] = None,
+) -> None:
+    """Queue a usage record from a LiteLLM usage object."""
+    details = getattr(usage, "prompt_tokens_details", None)
+    usage_recorder.record(
+        user_id=user_id,
+        document_type=document_type,
+        model=model,
+        prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+        completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+        cached_tokens=(getattr(details, "cached_tokens", 0) if details is not None else 0) or 0,
+        cost_usd=cost_usd,
+        latency_ms=latency_ms,
+    )
+
+
+class UsageService:
+    """Queries over recorded LLM usage."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def summarize(self, user_id: Optional[int] = None, since: Optional[datetime] = None) -> list[dict]:
+        """Aggregate usage by document type, optionally for one user and time window."""
+        query = self.db.query(
+            LLMUsage.document_type,
+            func.count(LLMUsage.id),
+            func.coalesce(func.sum(LLMUsage.prompt_tokens), 0),
+            func.coalesce(func.sum(LLMUsage.completion_tokens), 0),
+            func.coalesce(func.sum(LLMUsage.cached_tokens), 0),
+            func.coalesce(func.sum(LLMUsage.cost_usd), 0.0),
+            func.coalesce(func.avg(LLMUsage.latency_ms), 0.0),
+        )
+        if user_id is not None:
+            query = query.filter(LLMUsage.user_id == user_id)
+        if since is not None:
+            query = query.filter(LLMUsage.created_at >= since)
+
+        rows = query.group_by(LLMUsage.document_type).all()
+        return [
+            {
+                "document_type": document_type,
+                "calls": calls,
+                "prompt_tokens": prompt,
+                "completion_tokens": completion,
+                "cached_tokens": cached,
+                "cost_usd": cost,
+                "avg_latency_ms": avg_latency,
+            }
+            for document_type, calls, prompt, completion, cached, cost, avg_latency in rows
+        ]
+
+    def get_token_total(self, user_id: int, since: datetime) -> int:
+        """Total prompt and completion tokens used by a user since a time."""
+        total = (
+            self.db.query(func.sum(LLMUsage.prompt_tokens + LLMUsage.completion_tokens))
+            .filter(LLMUsage.user_id == user_id, LLMUsage.created_at >= since)
+            .scalar()
+        )
+        return total or 0
+
+    def is_over_quota(self, user_id: int) -> bool:
+        """Whether a user has exhausted their rolling 30-day token quota."""
+        if USER_MONTHLY_TOKEN_QUOTA <= 0:
+            return False
+        since = datetime.now(timezone.utc) - timedelta(days=30)
+        return self.get_token_total(user_id, since) >= USER_MONTHLY_TOKEN_QUOTA